@@ -0,0 +1,252 @@
+"""Incrementally maintained fleet analytics over the company store.
+
+Store events update running aggregates instead of rescanning the fleet:
+
+- per sort key (overall, DRG 1-7): a Fenwick tree of counts over the score
+  range 0-10 in steps of 0.01 (scores are rounded to two decimals), so a
+  percentile rank or a quantile is a prefix-sum walk over a fixed 1001 bins,
+  i.e. constant time however many companies there are;
+- per DRG pair: running sums of x and x*y over the scores in hundredths, kept
+  as Python ints so adds and removes cancel exactly (no float drift), from
+  which Pearson correlations are computed on read;
+- per indicator: a count per raw score value.
+
+Each company's last contribution is remembered so an update or delete can
+subtract exactly what was added. Bulk changes (a rescore) refresh the
+contributions and recount every aggregate in one pass instead.
+"""
+import math
+import operator
+import threading
+from collections import Counter
+
+from leaderboard import SORT_KEYS, scores_for
+from scoring import DRG_KEYS
+
+SCALE = 100
+MAX_SCORE = 10
+BINS = MAX_SCORE * SCALE + 1
+QUANTILES = (10, 25, 50, 75, 90)
+
+
+def _bin(value) -> int:
+    return min(BINS - 1, max(0, int(round(value * SCALE))))
+
+
+def _score_value(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(number):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+class _Fenwick:
+    """Counts per bin with O(log BINS) point updates and prefix sums."""
+
+    def __init__(self, size, counts=None):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.total = 0
+        if counts:
+            # Linear-time build: each node passes its sum to its parent once
+            for i, c in enumerate(counts, 1):
+                self.tree[i] += c
+                parent = i + (i & -i)
+                if parent <= size:
+                    self.tree[parent] += self.tree[i]
+            self.total = sum(counts)
+
+    def add(self, i, delta):
+        self.total += delta
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i) -> int:
+        """Count in bins [0, i)."""
+        s = 0
+        while i > 0:
+            s += self.tree[i]
+            i -= i & -i
+        return s
+
+    def find(self, k) -> int:
+        """Smallest bin whose prefix count (inclusive) exceeds k (0 <= k < total)."""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class FleetAnalytics:
+    def __init__(self, companies=None):
+        self._lock = threading.RLock()
+        self.rebuild(companies or [])
+
+    def rebuild(self, companies):
+        with self._lock:
+            self._contrib = {c['id']: self._contribution(c) for c in companies if c.get('id') is not None}
+            self._recount()
+
+    def update_many(self, companies, scores_changed=True):
+        """Re-read many changed companies, then recount once (rescore).
+
+        With scores_changed=False only overall/DRG scores moved, so each company's
+        indicator part is kept and the indicator histograms are left as they are.
+        """
+        with self._lock:
+            for c in companies:
+                previous = self._contrib.get(c['id'])
+                if scores_changed or previous is None:
+                    self._contrib[c['id']] = self._contribution(c)
+                else:
+                    self._contrib[c['id']] = (self._bins(c), previous[1])
+            self._recount(indicators=scores_changed)
+
+    def _recount(self, indicators=True):
+        # Column-wise over all contributions: Counter, sum and map(mul) run in C
+        rows = [bins for bins, _ in self._contrib.values()]
+        cols = {k: [b[k] for b in rows] for k in SORT_KEYS}
+        self._sum = {k: sum(col) for k, col in cols.items()}
+        self._trees = {}
+        for k, col in cols.items():
+            counts = [0] * BINS
+            for b, n in Counter(col).items():
+                counts[b] = n
+            self._trees[k] = _Fenwick(BINS, counts)
+        drg = [cols[k] for k in DRG_KEYS]
+        self._cross = [[0] * len(DRG_KEYS) for _ in DRG_KEYS]
+        for i in range(len(drg)):
+            for j in range(i, len(drg)):
+                self._cross[i][j] = sum(map(operator.mul, drg[i], drg[j]))
+        if indicators:
+            self._indicators = {}
+            pairs = Counter(pair for _, scores in self._contrib.values() for pair in scores.items())
+            for (name, value), n in pairs.items():
+                self._indicators.setdefault(name, {})[value] = n
+
+    @staticmethod
+    def _bins(company):
+        return dict(zip(SORT_KEYS, map(_bin, scores_for(company))))
+
+    @classmethod
+    def _contribution(cls, company):
+        scores = {}
+        for name, value in (company.get('scores') or {}).items():
+            value = _score_value(value)
+            if value is not None:
+                scores[name] = value
+        return cls._bins(company), scores
+
+    def _apply(self, bins, scores, sign):
+        for k, b in bins.items():
+            self._trees[k].add(b, sign)
+            self._sum[k] += sign * b
+        drg = [bins[k] for k in DRG_KEYS]
+        for i, x in enumerate(drg):
+            row = self._cross[i]
+            for j in range(i, len(drg)):
+                row[j] += sign * x * drg[j]
+        for name, value in scores.items():
+            counts = self._indicators.setdefault(name, {})
+            counts[value] = counts.get(value, 0) + sign
+            if not counts[value]:
+                del counts[value]
+                if not counts:
+                    del self._indicators[name]
+
+    def put(self, company):
+        contrib = self._contribution(company)
+        with self._lock:
+            # Rescores and name/website edits usually leave the numbers as they were
+            if self._contrib.get(company['id']) == contrib:
+                return
+            self._remove(company['id'])
+            self._apply(*contrib, 1)
+            self._contrib[company['id']] = contrib
+
+    def delete(self, company_id):
+        with self._lock:
+            self._remove(company_id)
+
+    def _remove(self, company_id):
+        previous = self._contrib.pop(company_id, None)
+        if previous is not None:
+            self._apply(previous[0], previous[1], -1)
+
+    def __len__(self):
+        return len(self._contrib)
+
+    # --- reads ---
+    def percentile(self, company_id, key='overall'):
+        """Share of the fleet scoring below the company (ties count half), 0-100; None if unknown."""
+        with self._lock:
+            contrib = self._contrib.get(company_id)
+            if contrib is None:
+                return None
+            tree = self._trees[key]
+            b = contrib[0][key]
+            below = tree.prefix(b)
+            equal = tree.prefix(b + 1) - below
+            return round((below + equal / 2) / tree.total * 100, 2)
+
+    def quantile(self, key, q):
+        """Score at percentile q (nearest rank), or None for an empty fleet."""
+        with self._lock:
+            tree = self._trees[key]
+            if not tree.total:
+                return None
+            rank = min(tree.total - 1, max(0, math.ceil(q / 100 * tree.total) - 1))
+            return tree.find(rank) / SCALE
+
+    def distribution(self, key) -> dict:
+        with self._lock:
+            n = self._trees[key].total
+            return {
+                'count': n,
+                'mean': round(self._sum[key] / n / SCALE, 2) if n else None,
+                'quantiles': {f'p{q}': self.quantile(key, q) for q in QUANTILES},
+            }
+
+    def correlations(self) -> dict:
+        """Pearson correlation between every pair of DRG scores ({'1': {'2': r, ...}, ...})."""
+        with self._lock:
+            n = len(self._contrib)
+            sums = [self._sum[k] for k in DRG_KEYS]
+            cross = [list(row) for row in self._cross]
+        result = {a: {} for a in DRG_KEYS}
+        for i, a in enumerate(DRG_KEYS):
+            for j, b in enumerate(DRG_KEYS):
+                lo, hi = min(i, j), max(i, j)
+                cov = n * cross[lo][hi] - sums[i] * sums[j]
+                var = (n * cross[i][i] - sums[i] ** 2) * (n * cross[j][j] - sums[j] ** 2)
+                result[a][b] = round(cov / math.sqrt(var), 4) if n > 1 and var > 0 else None
+        return result
+
+    def indicator_histograms(self) -> dict:
+        """{indicator: [{'score': value, 'count': n}, ...]} in score order."""
+        with self._lock:
+            return {
+                name: [{'score': v, 'count': c} for v, c in sorted(counts.items())]
+                for name, counts in sorted(self._indicators.items())
+            }
+
+    def summary(self) -> dict:
+        # One lock hold so every section describes the same fleet
+        with self._lock:
+            return {
+                'count': len(self),
+                'overall': self.distribution('overall'),
+                'drg': {k: self.distribution(k) for k in DRG_KEYS},
+                'correlations': self.correlations(),
+                'indicators': self.indicator_histograms(),
+            }
@@ -0,0 +1,51 @@
+"""SVG score badges for embedding on partner sites."""
+
+BADGE_WIDTH = 120
+BADGE_HEIGHT = 30
+BADGE_COLOR = "#ffdd00"  # Yellow from the palette
+MAX_SCORE = 10
+
+
+def badge_score(company) -> float:
+    try:
+        return float(company.get('overallScore') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _badge_body(score) -> str:
+    bar = max(0.0, min(score, MAX_SCORE)) / MAX_SCORE * BADGE_WIDTH
+    return (
+        f'<rect width="100%" height="100%" fill="black"/>'
+        f'<rect x="0" y="0" width="{bar:.1f}" height="100%" fill="{BADGE_COLOR}"/>'
+        f'<text x="50%" y="50%" font-family="Arial" font-size="14" fill="white" text-anchor="middle" alignment-baseline="middle">'
+        f'Score: {score:.1f}</text>'
+    )
+
+
+def render_badge(score) -> str:
+    return (
+        f'<svg width="{BADGE_WIDTH}" height="{BADGE_HEIGHT}" xmlns="http://www.w3.org/2000/svg">'
+        f'{_badge_body(score)}</svg>'
+    )
+
+
+def render_sprite(scores_by_id) -> str:
+    """Badges stacked in one SVG, each addressable as <img src="...sprite.svg#badge-<id>">.
+
+    Every badge gets a <view id="badge-<id>"> over its slot; a fragment naming a
+    view renders just that slot, in <img> and CSS backgrounds alike (unlike
+    <symbol>, which only <use> can show, and not across origins).
+    """
+    parts = []
+    for i, (cid, score) in enumerate(scores_by_id.items()):
+        y = i * BADGE_HEIGHT
+        parts.append(
+            f'<view id="badge-{cid}" viewBox="0 {y} {BADGE_WIDTH} {BADGE_HEIGHT}"/>'
+            f'<svg y="{y}" width="{BADGE_WIDTH}" height="{BADGE_HEIGHT}">{_badge_body(score)}</svg>'
+        )
+    height = max(1, len(parts)) * BADGE_HEIGHT
+    return (
+        f'<svg width="{BADGE_WIDTH}" height="{height}" viewBox="0 0 {BADGE_WIDTH} {height}" '
+        f'xmlns="http://www.w3.org/2000/svg">{"".join(parts)}</svg>'
+    )
@@ -0,0 +1,58 @@
+"""Micro-benchmark: CompanyStore lookup/insert/delete latency vs. fleet size.
+
+Run from backend/:  python benchmarks/bench_company_store.py
+Latency should stay flat from 100 to 100k companies; the old linear scan
+(`next(c for c in companies if c['id'] == ...)`) is shown for comparison.
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from company_store import CompanyStore  # noqa: E402
+
+SIZES = [100, 1_000, 10_000, 100_000]
+OPS = 2_000
+
+
+def _fleet(n):
+    return [{'id': i + 1, 'name': f'Company {i + 1}', 'scores': {}} for i in range(n)]
+
+
+def _per_op_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def bench(n):
+    companies = _fleet(n)
+    store = CompanyStore(companies)
+    ids = [random.randint(1, n) for _ in range(OPS)]
+    it = iter(ids * 4)
+
+    lookup = _per_op_us(lambda: store.get(next(it)), OPS)
+
+    def insert_delete():
+        c = store.add({'name': 'tmp'})
+        store.delete(c['id'])
+    churn = _per_op_us(insert_delete, OPS)
+
+    it2 = iter(ids * 4)
+
+    def linear_scan():
+        target = next(it2)
+        return next((c for c in companies if c['id'] == target), None)
+    linear = _per_op_us(linear_scan, max(1, min(OPS, 200_000 // n)))
+    return lookup, churn, linear
+
+
+def main():
+    print(f"{'companies':>10} {'get (us)':>10} {'add+delete (us)':>16} {'linear scan (us)':>17}")
+    for n in SIZES:
+        lookup, churn, linear = bench(n)
+        print(f"{n:>10} {lookup:>10.3f} {churn:>16.3f} {linear:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""Endpoint benchmarks: every route in app.py, in-process and over real HTTP.
+
+Run from backend/:
+  python benchmarks/bench_endpoints.py                  # Flask test client, 100 / 1k / 10k companies
+  python benchmarks/bench_endpoints.py --mode http      # gunicorn with gunicorn.conf.py
+  python benchmarks/bench_endpoints.py --save-baseline  # record benchmarks/baseline.json
+  python benchmarks/bench_endpoints.py --check          # exit 1 on regressions against the baseline
+
+Each dataset size runs against a fresh sandbox directory: companies.json is
+seeded with N scored companies, the catalog is a scorable CSV built from the
+real indicator names, and OpenAI and Supabase are local stubs (stubs.py), so
+nothing leaves the machine and upstream latency is whatever --upstream-latency
+says (0 by default, i.e. only our own overhead is measured).
+
+A scenario regresses when its p50 is more than --tolerance slower than the
+baseline (and by more than --min-delta-ms), or its throughput drops by the
+same factor. Baselines are machine-specific: record one on the host that runs
+--check. Feedback routes need the `supabase` package (requirements.txt).
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from stubs import SUPABASE_STUB_KEY, start_openai_stub, start_supabase_stub  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DRG_KEYS = ['1', '2', '3', '4', '5', '6', '7']
+
+
+# --- sandbox -----------------------------------------------------------------
+
+def _indicator_names():
+    path = os.path.join(REPO_DIR, 'Indicator_Shortlist_with_Infosites.csv')
+    try:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            names = [r.get('Criterion/Metric Name', '').strip() for r in csv.DictReader(f, delimiter=';')]
+    except OSError:
+        names = []
+    return [n for n in names if n] or [f'Indicator {i}' for i in range(1, 21)]
+
+
+def make_sandbox(n_companies):
+    """Temp tree shaped like the repo: <tmp>/backend is the app's cwd, the catalog sits next to it."""
+    root = tempfile.mkdtemp(prefix='idvdri-bench-')
+    backend = os.path.join(root, 'backend')
+    os.makedirs(backend)
+    names = _indicator_names()
+    with open(os.path.join(root, 'Indicator_Shortlist_with_Q_Rationale.csv'), 'w', encoding='utf-8', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(['Criterion/Metric Name', 'Rationale', 'Scoring Logic', 'DRG', 'Legend', 'Question'])
+        for i, name in enumerate(names):
+            w.writerow([name, f'Why {name} matters.', '0=None; 1=Basic; 2=Managed; 3=Leading',
+                        DRG_KEYS[i % 7], 'None – Basic – Managed – Leading', f'How does the organisation handle {name}?'])
+    companies = []
+    for cid in range(1, n_companies + 1):
+        scores = {name: (cid * 7 + j) % 4 for j, name in enumerate(names)}
+        companies.append({'id': cid, 'name': f'Company {cid}', 'scores': scores,
+                          'overallScore': round((cid * 37) % 1000 / 100, 2),
+                          'perDRG': {k: round((cid * (int(k) + 3)) % 1000 / 100, 2) for k in DRG_KEYS}})
+    with open(os.path.join(backend, 'companies.json'), 'w', encoding='utf-8') as f:
+        json.dump(companies, f)
+    return root, backend, names
+
+
+def sandbox_env(backend, openai_url, supabase_url):
+    return dict(
+        os.environ,
+        OPENAI_API_KEY='stub-key', OPENAI_BASE_URL=openai_url,
+        SUPABASE_URL=supabase_url, SUPABASE_ANON_KEY=SUPABASE_STUB_KEY,
+        LLM_CACHE_PATH=os.path.join(backend, 'llm_cache.sqlite3'),
+        FEEDBACK_SPOOL_PATH=os.path.join(backend, 'feedback_spool.jsonl'),
+        FEEDBACK_FLUSH_INTERVAL='0.2',
+        # The benchmark is one client hammering the chat; don't measure the rate limiter's 429s
+        CHAT_SESSION_RATE_PER_MIN='1000000', CHAT_SESSION_BURST='1000000',
+        CHAT_IP_RATE_PER_MIN='1000000', CHAT_IP_BURST='1000000',
+        PYTHONPATH=BACKEND_DIR,
+    )
+
+
+# --- drivers -----------------------------------------------------------------
+
+class ClientDriver:
+    """Flask test client: the app's own cost, no sockets."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def call(self, method, path, body=None, headers=None):
+        if isinstance(body, bytes):
+            resp = self.client.open(path, method=method, data=body, headers=headers)
+        else:
+            resp = self.client.open(path, method=method, json=body, headers=headers)
+        data = resp.get_data()
+        return resp.status_code, data
+
+
+class HttpDriver:
+    def __init__(self, base):
+        import requests
+        self.base = base
+        self._requests = requests
+        self._local = threading.local()
+
+    def call(self, method, path, body=None, headers=None):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        if isinstance(body, bytes):
+            resp = session.request(method, self.base + path, data=body, headers=headers, timeout=60)
+        else:
+            resp = session.request(method, self.base + path, json=body, headers=headers, timeout=60)
+        return resp.status_code, resp.content
+
+
+# --- scenarios ---------------------------------------------------------------
+
+def scenarios(n, names, created):
+    """(name, request(i) -> (method, path, body, headers), ok statuses, max requests or None)."""
+    ids = list(range(1, n + 1))
+    pick = lambda i: ids[(i * 7919) % len(ids)]  # noqa: E731
+    sprite_ids = ','.join(str(pick(i)) for i in range(50))
+    chat = lambda i, stream=False: ('POST', '/api/llm/chat', {  # noqa: E731
+        'messages': [{'role': 'user', 'content': f'How is {names[i % len(names)]} scored? ({i})'}],
+        'context': {'route': '/bench', 'session_id': f'bench-{i}'}, 'stream': stream}, None)
+
+    import_body = ''.join(json.dumps({'name': f'Import {j}', 'scores': {names[j % len(names)]: j % 4}}) + '\n'
+                          for j in range(500)).encode('utf-8')
+
+    def create(i):
+        return ('POST', '/api/companies', {'name': f'Bench {i}', 'scores': {names[0]: 2, names[1]: 1}}, None)
+
+    def delete(i):
+        return ('DELETE', f'/api/companies/{created[i % len(created)]}' if created else '/api/companies/0', None, None)
+
+    return [
+        ('health', lambda i: ('GET', '/api/health', None, None), {200}, None),
+        ('indicators', lambda i: ('GET', '/api/indicators', None, None), {200}, None),
+        ('indicators 304', lambda i: ('GET', '/api/indicators', None, {'If-None-Match': '*'}), {200, 304}, None),
+        ('companies list', lambda i: ('GET', '/api/companies', None, None), {200}, 50),
+        ('leaderboard page', lambda i: ('GET', '/api/leaderboard?limit=50', None, None), {200}, None),
+        ('leaderboard drg3 deep', lambda i: ('GET', '/api/leaderboard?sort=drg3&limit=100&fields=name,perDRG', None, None), {200}, None),
+        ('company rank', lambda i: ('GET', f'/api/leaderboard/{pick(i)}', None, None), {200}, None),
+        ('analytics', lambda i: ('GET', '/api/analytics', None, None), {200}, None),
+        ('company percentiles', lambda i: ('GET', f'/api/analytics/company/{pick(i)}', None, None), {200}, None),
+        ('company create', create, {201}, None),
+        ('company update', lambda i: ('PUT', f'/api/companies/{pick(i)}', {'scores': {names[2]: i % 4}}, None), {200}, None),
+        ('company delete', delete, {200, 404}, None),
+        ('rescore', lambda i: ('POST', '/api/companies/rescore', None, None), {200}, 5),
+        ('badge', lambda i: ('GET', f'/api/badge/{pick(i)}', None, None), {200}, None),
+        ('badge sprite x50', lambda i: ('GET', f'/api/badges/sprite.svg?ids={sprite_ids}', None, None), {200}, None),
+        ('llm explain', lambda i: ('POST', '/api/llm-explain', {'criterion_name': names[i % len(names)]}, None), {200}, None),
+        ('chat', lambda i: chat(i), {200}, None),
+        ('chat stream', lambda i: chat(i, True), {200}, None),
+        ('feedback post', lambda i: ('POST', '/api/feedback', {
+            'session_id': f'bench-{i}', 'route': '/bench', 'message': f'Benchmark feedback {i}', 'consent': True}, None), {202}, None),
+        ('feedback page', lambda i: ('GET', '/api/feedback?limit=100', None, None), {200}, None),
+        ('feedback export csv', lambda i: ('GET', '/api/feedback/export?format=csv', None, None), {200}, 10),
+        ('metrics', lambda i: ('GET', '/metrics', None, None), {200}, None),
+        # Last: each import adds 500 companies, which would skew every scenario after it
+        ('company import x500', lambda i: ('POST', '/api/companies/import?format=ndjson', import_body, None), {200}, 10),
+        ('companies export csv', lambda i: ('GET', '/api/companies/export?format=csv', None, None), {200}, 10),
+    ]
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run_scenarios(driver, n, names, requests_per, concurrency, only=None):
+    created = []
+    results = {}
+    for name, make, ok, cap in scenarios(n, names, created):
+        if only and not any(o in name for o in only):
+            continue
+        count = min(requests_per, cap) if cap else requests_per
+        # One untimed warm-up request fills lazy caches and pools the way production traffic would
+        driver.call(*make(0))
+        errors = []
+
+        def one(i):
+            method, path, body, headers = make(i)
+            started = time.perf_counter()
+            status, data = driver.call(method, path, body, headers)
+            elapsed = (time.perf_counter() - started) * 1000
+            if status not in ok:
+                errors.append(status)
+            elif name == 'company create':
+                created.append(json.loads(data)['id'])
+            return elapsed
+
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as ex:
+                latencies = list(ex.map(one, range(1, count + 1)))
+        else:
+            latencies = [one(i) for i in range(1, count + 1)]
+        wall = time.perf_counter() - started
+        results[name] = {
+            'requests': count,
+            'rps': round(count / wall, 1),
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p99_ms': round(_pct(latencies, 99), 3),
+            'errors': len(errors),
+        }
+        if errors:
+            results[name]['error_statuses'] = sorted(set(errors))
+    return results
+
+
+# --- orchestration -----------------------------------------------------------
+
+def _child(n, requests_per, only, names):
+    """Runs inside the sandbox (cwd) with the stub env: import the app fresh and drive it in-process."""
+    import app as app_module
+    return run_scenarios(ClientDriver(app_module.app), n, names, requests_per, 1, only)
+
+
+def run_size(mode, n, args, openai_url, supabase_url):
+    root, backend, names = make_sandbox(n)
+    env = sandbox_env(backend, openai_url, supabase_url)
+    try:
+        if mode == 'client':
+            cmd = [sys.executable, os.path.abspath(__file__), '--child', str(n), '--requests', str(args.requests)]
+            if args.only:
+                cmd += ['--only', *args.only]
+            out = subprocess.run(cmd, cwd=backend, env=env, capture_output=True, text=True)
+            if out.returncode != 0:
+                raise RuntimeError(f"benchmark child failed:\n{out.stderr[-4000:]}")
+            return json.loads(out.stdout.strip().splitlines()[-1])
+        port = args.port
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'),
+             '--pythonpath', BACKEND_DIR, '-w', str(args.workers), '-b', f'127.0.0.1:{port}', 'app:app'],
+            cwd=backend, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            driver = HttpDriver(f'http://127.0.0.1:{port}')
+            deadline = time.time() + 30
+            while True:
+                try:
+                    if driver.call('GET', '/api/health')[0] == 200:
+                        break
+                except Exception:
+                    pass
+                if time.time() > deadline:
+                    raise RuntimeError('gunicorn did not come up')
+                time.sleep(0.2)
+            return run_scenarios(driver, n, names, args.requests, args.concurrency, args.only)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=15)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    regressions = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        slower = cur['p50_ms'] > base['p50_ms'] * (1 + tolerance) and cur['p50_ms'] - base['p50_ms'] > min_delta_ms
+        fewer = cur['rps'] * (1 + tolerance) < base['rps'] and cur['p50_ms'] - base['p50_ms'] > min_delta_ms
+        if slower or fewer:
+            regressions.append((key, base, cur))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['client', 'http'], default='client')
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma-separated company counts')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads in http mode')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers in http mode')
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--upstream-latency', type=float, default=0.0, help='seconds the OpenAI/Supabase stubs wait')
+    parser.add_argument('--only', nargs='*', help='run scenarios whose name contains any of these')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help='exit 1 when a scenario regressed')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed slowdown, 0.5 = 50%%')
+    parser.add_argument('--min-delta-ms', type=float, default=0.2, help='ignore p50 changes smaller than this')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        names = _indicator_names()
+        print(json.dumps(_child(args.child, args.requests, args.only, names)))
+        return 0
+
+    openai_server, openai_url = start_openai_stub(latency=args.upstream_latency)
+    supabase_server, supabase_url = start_supabase_stub(latency=args.upstream_latency, seed_rows=2000)
+    results = {}
+    print(f"mode={args.mode} requests/scenario={args.requests} upstream latency={args.upstream_latency}s")
+    print(f"{'size':>6}  {'scenario':<24} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>6}")
+    try:
+        for n in [int(s) for s in args.sizes.split(',') if s.strip()]:
+            for name, r in run_size(args.mode, n, args, openai_url, supabase_url).items():
+                results[f"{args.mode}/{n}/{name}"] = r
+                print(f"{n:>6}  {name:<24} {r['rps']:>9.1f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['errors']:>6}")
+    finally:
+        openai_server.shutdown()
+        supabase_server.shutdown()
+
+    failed = [k for k, r in results.items() if r['errors']]
+    for key in failed:
+        print(f"ERRORS  {key}: statuses {results[key].get('error_statuses')}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for key, base, cur in regressions:
+        print(f"REGRESSION  {key}: p50 {base['p50_ms']} -> {cur['p50_ms']} ms, req/s {base['rps']} -> {cur['rps']}")
+    if baseline and not regressions:
+        print(f"No regressions against {os.path.relpath(args.baseline)} (tolerance {args.tolerance:.0%}).")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': f"{platform.platform()} / Python {platform.python_version()}",
+                       'results': dict(sorted(baseline.items()))}, f, indent=1)
+            f.write('\n')
+        print(f"Baseline written to {os.path.relpath(args.baseline)}")
+    if args.check and (regressions or failed):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Cold-start budget: time `import app` in fresh interpreters and fail above the budget.
+
+Run from backend/:
+  python benchmarks/bench_startup.py                   # 7 runs, 300 ms budget, 1000 companies
+  python benchmarks/bench_startup.py --runs 15 --companies 10000 --budget-ms 400
+
+Each run is a new process importing the app inside a sandbox (see
+bench_endpoints.make_sandbox), so .pyc files are warm but nothing else is:
+this is what an autoscaled instance or a fresh gunicorn worker pays. The
+median is checked against the budget. The script also fails if one of the
+deferred integrations (Supabase, Vertex AI, numpy, requests) got imported at
+start-up, and reports what each deferred component costs on first use.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_endpoints import make_sandbox  # noqa: E402
+from stubs import SUPABASE_STUB_KEY  # noqa: E402
+
+DEFERRED_MODULES = ('supabase', 'vertexai', 'numpy', 'requests')
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+loaded = [m for m in %(deferred)r if m in sys.modules]
+first_use = {}
+if %(first_use)r:
+    for lazy in (app.SCORING, app.ANALYTICS, app.SUPABASE, app.VERTEX_MODEL):
+        lazy.get()
+        first_use[lazy.name] = round(lazy.load_seconds * 1000, 1)
+print(json.dumps({'import_ms': elapsed * 1000, 'loaded': loaded, 'first_use_ms': first_use}))
+"""
+
+
+def _run(backend, env, first_use=False):
+    code = CHILD % {'deferred': DEFERRED_MODULES, 'first_use': first_use}
+    out = subprocess.run([sys.executable, '-c', code], cwd=backend, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"import failed:\n{out.stderr[-4000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _top_imports(backend, env, n=12):
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                         cwd=backend, env=env, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split('|')
+        # Direct imports of the app only (two-space indent), by cumulative microseconds
+        if len(parts) == 3 and parts[2].startswith('   ') and not parts[2].startswith('    '):
+            try:
+                rows.append((int(parts[1]), parts[2].strip()))
+            except ValueError:
+                continue
+    return sorted(rows, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=300.0)
+    parser.add_argument('--companies', type=int, default=1000)
+    args = parser.parse_args()
+
+    root, backend, _ = make_sandbox(args.companies)
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.path.dirname(BENCH_DIR),
+        # Configured but never contacted: the client is only built on first use
+        SUPABASE_URL='http://127.0.0.1:9', SUPABASE_ANON_KEY=SUPABASE_STUB_KEY,
+        OPENAI_API_KEY='stub-key', OPENAI_BASE_URL='http://127.0.0.1:9',
+        LLM_CACHE_PATH=os.path.join(backend, 'llm_cache.sqlite3'),
+        FEEDBACK_SPOOL_PATH=os.path.join(backend, 'feedback_spool.jsonl'),
+    )
+    env.pop('LAZY_PREWARM', None)
+    try:
+        _run(backend, env)  # compile .pyc files once
+        runs = [_run(backend, env) for _ in range(args.runs)]
+        first = _run(backend, env, first_use=True)
+        top = _top_imports(backend, env)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    times = sorted(r['import_ms'] for r in runs)
+    median = statistics.median(times)
+    print(f"import app ({args.companies} companies, {args.runs} runs): "
+          f"median {median:.0f} ms, min {times[0]:.0f} ms, max {times[-1]:.0f} ms, budget {args.budget_ms:.0f} ms")
+    print("largest direct imports (cumulative):")
+    for us, name in top:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    print("deferred to first use: " + ', '.join(f"{k} {v} ms" for k, v in first['first_use_ms'].items()))
+
+    failed = False
+    loaded = sorted({m for r in runs for m in r['loaded']})
+    if loaded:
+        print(f"FAIL  imported at start-up although deferred: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL  median import time {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
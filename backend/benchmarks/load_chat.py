@@ -0,0 +1,113 @@
+"""Load test: concurrent chats against gunicorn, sync workers vs. gunicorn.conf.py (gthread).
+
+Run from backend/:  python benchmarks/load_chat.py [--chats 200] [--latency 0.5] [--workers 2]
+
+A local OpenAI stub answers each chat after --latency seconds. While the
+chats are in flight, a probe keeps hitting /api/health; with sync workers
+those cheap GETs queue behind the LLM waits, with gthread they do not.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import start_openai_stub  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _pct(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def _wait_ready(base, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base}/api/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn did not come up')
+
+
+def run(label, gunicorn_args, env, port, chats):
+    base = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *gunicorn_args, '-b', f"127.0.0.1:{port}", 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(base)
+        stop = threading.Event()
+        probe_ms = []
+
+        def probe():
+            with requests.Session() as s:
+                while not stop.is_set():
+                    t = time.perf_counter()
+                    try:
+                        s.get(f"{base}/api/health", timeout=30)
+                    except requests.RequestException:
+                        continue
+                    probe_ms.append((time.perf_counter() - t) * 1000)
+                    time.sleep(0.02)
+
+        def chat(i):
+            t = time.perf_counter()
+            r = requests.post(f"{base}/api/llm/chat", timeout=120, json={
+                'messages': [{'role': 'user', 'content': f'Load test message {i}'}],
+                'context': {'route': '/load-test', 'session_id': f'load-{i}'},
+            })
+            r.raise_for_status()
+            return (time.perf_counter() - t) * 1000
+
+        prober = threading.Thread(target=probe, daemon=True)
+        prober.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=chats) as ex:
+            chat_ms = list(ex.map(chat, range(chats)))
+        wall = time.perf_counter() - started
+        stop.set()
+        prober.join()
+        print(f"{label:<34} {chats / wall:>8.1f} {_pct(chat_ms, 50):>9.0f} {_pct(chat_ms, 99):>9.0f} "
+              f"{statistics.median(probe_ms) if probe_ms else float('nan'):>10.1f} {_pct(probe_ms, 99):>10.1f}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chats', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    server, url = start_openai_stub(latency=args.latency)
+    env = dict(os.environ, OPENAI_API_KEY='stub-key', OPENAI_BASE_URL=url, WEB_CONCURRENCY=str(args.workers))
+    print(f"{args.chats} concurrent chats, upstream latency {args.latency:.2f}s, {args.workers} workers")
+    print(f"{'configuration':<34} {'chats/s':>8} {'chat p50':>9} {'chat p99':>9} {'health p50':>10} {'health p99':>10}")
+    try:
+        # --threads 1: gunicorn silently upgrades sync to gthread when threads > 1
+        run('sync workers', ['-k', 'sync', '--threads', '1', '-w', str(args.workers)], env, args.port, args.chats)
+        run('gunicorn.conf.py (gthread)', ['-c', 'gunicorn.conf.py'], env, args.port + 1, args.chats)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Local stand-ins for upstream services, for benchmarks and load tests.
+
+    server, url = start_openai_stub(latency=0.5)
+    ... point OPENAI_BASE_URL at url ...
+    server.shutdown()
+
+    server, url = start_supabase_stub()
+    ... point SUPABASE_URL at url and SUPABASE_ANON_KEY at SUPABASE_STUB_KEY ...
+"""
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# supabase-py only checks that the key looks like a JWT; the stub ignores it
+SUPABASE_STUB_KEY = 'eyJhbGciOiJub25lIn0.eyJyb2xlIjoiYW5vbiJ9.stub'
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def _start(handler_cls):
+    server = _Server(('127.0.0.1', 0), handler_cls)
+    threading.Thread(target=server.serve_forever, name=handler_cls.__name__, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def start_openai_stub(latency=0.5, reply='Stub reply from the local OpenAI stand-in.', chunks=8):
+    """/chat/completions after `latency` seconds; streamed requests get `chunks` SSE deltas."""
+
+    class OpenAIStub(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this each response waits on a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            time.sleep(latency)
+            if not body.get('stream'):
+                data = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': reply}}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            step = max(1, len(reply) // chunks)
+            pieces = [reply[i:i + step] for i in range(0, len(reply), step)]
+            try:
+                for piece in pieces:
+                    event = f"data: {json.dumps({'choices': [{'delta': {'content': piece}}]})}\n\n".encode()
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(event), event))
+                    self.wfile.flush()
+                event = b'data: [DONE]\n\n'
+                self.wfile.write(b'%x\r\n%s\r\n0\r\n\r\n' % (len(event), event))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return _start(OpenAIStub)
+
+
+_OR_KEYSET = re.compile(r'^\(created_at\.lt\."(.*?)",and\(created_at\.eq\."(.*?)",id\.lt\."(.*?)"\)\)$')
+
+
+def _postgrest_filter(params):
+    """Row predicate for the PostgREST subset the backend uses: col=eq.value and the feedback keyset `or`."""
+    checks = []
+    for key, value in params:
+        if key in ('select', 'order', 'limit', 'offset'):
+            continue
+        if key == 'or':
+            m = _OR_KEYSET.match(value)
+            if not m:
+                raise ValueError(f"unsupported or filter: {value}")
+            ts, _, row_id = m.groups()
+            row_id = int(row_id)
+            checks.append(lambda r, ts=ts, row_id=row_id: r['created_at'] < ts or (r['created_at'] == ts and r['id'] < row_id))
+        elif value.startswith('eq.'):
+            checks.append(lambda r, k=key, v=value[3:]: str(r.get(k)) == v)
+        else:
+            raise ValueError(f"unsupported filter: {key}={value}")
+    return lambda r: all(check(r) for check in checks)
+
+
+def start_supabase_stub(latency=0.0, seed_rows=0):
+    """In-memory PostgREST subset at /rest/v1/<table>: bulk insert, select with eq filters,
+    order by (created_at, id) desc, limit and the keyset `or` filter used for feedback pages."""
+    tables = {}
+    lock = threading.Lock()
+    ids = itertools.count(1)
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def insert(table, rows):
+        with lock:
+            out = []
+            for row in rows:
+                row_id = next(ids)
+                # Monotonic, second-granular timestamps so pages share created_at values
+                created = (epoch + timedelta(seconds=row_id // 3)).isoformat()
+                row = dict(row, id=row_id, created_at=created)
+                tables.setdefault(table, []).append(row)
+                out.append(row)
+            return out
+
+    insert('feedback', [{'session_id': f'seed-{i}', 'route': f'/route-{i % 5}', 'message': f'Seed feedback {i}',
+                         'feedback_type': 'general', 'consent': True} for i in range(seed_rows)])
+
+    class SupabaseStub(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this each response waits on a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _table(self):
+            parts = urlsplit(self.path)
+            m = re.match(r'^/rest/v1/(\w+)$', parts.path)
+            return (m.group(1) if m else None), parse_qsl(parts.query)
+
+        def do_POST(self):
+            table, _ = self._table()
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'[]')
+            time.sleep(latency)
+            if table is None:
+                return self._send(404, {'message': 'not found'})
+            self._send(201, insert(table, body if isinstance(body, list) else [body]))
+
+        def do_GET(self):
+            table, params = self._table()
+            # postgrest-py sends an empty JSON body with selects; drain it to keep the connection usable
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            time.sleep(latency)
+            if table is None:
+                return self._send(404, {'message': 'not found'})
+            try:
+                keep = _postgrest_filter(params)
+            except ValueError as e:
+                return self._send(400, {'message': str(e)})
+            q = dict(params)
+            with lock:
+                rows = [r for r in tables.get(table, []) if keep(r)]
+            if q.get('order', '').startswith('created_at.desc'):
+                rows.sort(key=lambda r: (r['created_at'], r['id']), reverse=True)
+            if 'limit' in q:
+                rows = rows[:int(q['limit'])]
+            self._send(200, rows)
+
+    server, url = _start(SupabaseStub)
+    server.tables = tables
+    return server, url
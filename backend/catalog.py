@@ -0,0 +1,177 @@
+"""Indicator catalog: tolerant CSV loading, derived indexes, hot reload.
+
+The catalog CSVs come out of spreadsheet exports, so the loader strips a
+UTF-8 BOM, sniffs the delimiter (`;` or `,`, also tab and `|`) and checks
+the required columns before accepting a file. Everything derived from the
+rows (name map, per-DRG lists, max score per indicator, content version)
+is built in one pass into an immutable `Catalog`.
+
+`CatalogLoader.refresh()` stats the source at most every `check_interval`
+seconds and reloads when its mtime or size changes. A new catalog is
+swapped in with one assignment and handed to subscribers, which rebuild
+whatever they derive from it; `version` is a hash of the content, so
+every worker reports the same version for the same file.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from scoring import DRG_KEYS, get_max_score_from_scoring_logic, indicator_drg
+
+NAME_COLUMN = 'Criterion/Metric Name'
+REQUIRED_COLUMNS = (NAME_COLUMN,)
+INDICATOR_FIELDS = ('Criterion/Metric Name', 'Rationale', 'Scoring Logic', 'DRG', 'Legend', 'DRG Short Code', 'Question')
+DELIMITERS = ';,\t|'
+
+
+class CatalogError(ValueError):
+    """A catalog file that cannot be used (unreadable, wrong columns, no rows)."""
+
+
+def _decode(raw) -> str:
+    for encoding in ('utf-8-sig', 'cp1252'):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('latin-1')
+
+
+def _delimiter(text) -> str:
+    header = text.split('\n', 1)[0]
+    try:
+        return csv.Sniffer().sniff(header, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        # One-column header or nothing to sniff: most frequent candidate wins, comma by default
+        counts = {d: header.count(d) for d in DELIMITERS}
+        best = max(counts, key=counts.get)
+        return best if counts[best] else ','
+
+
+def parse_catalog(raw) -> list:
+    """Indicator dicts from CSV bytes; raises CatalogError if the required columns are missing."""
+    text = _decode(raw)
+    reader = csv.DictReader(io.StringIO(text, newline=''), delimiter=_delimiter(text))
+    columns = [str(c or '').strip().lstrip('\ufeff') for c in (reader.fieldnames or [])]
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise CatalogError(f"missing column(s) {', '.join(missing)}; found {columns}")
+    reader.fieldnames = columns
+    indicators = []
+    for row in reader:
+        name = str(row.get(NAME_COLUMN) or '').strip()
+        if not name:
+            continue
+        ind = {field: str(row.get(field) or '').strip() for field in INDICATOR_FIELDS}
+        for column in columns:
+            if column and column not in ind:
+                ind[column] = str(row.get(column) or '').strip()
+        ind[NAME_COLUMN] = name
+        indicators.append(ind)
+    if not indicators:
+        raise CatalogError('no indicator rows')
+    return indicators
+
+
+class Catalog:
+    def __init__(self, indicators, source=None, stat=None):
+        self.indicators = list(indicators)
+        self.source = source
+        self.stat = stat
+        self.by_name = {}
+        self.by_drg = {k: [] for k in DRG_KEYS}
+        self.max_scores = {}
+        for ind in self.indicators:
+            name = str(ind.get(NAME_COLUMN) or '').strip()
+            if not name:
+                continue
+            self.by_name[name.lower()] = ind
+            self.max_scores[name] = get_max_score_from_scoring_logic(ind.get('Scoring Logic'))
+            drg = indicator_drg(ind)
+            if drg in self.by_drg:
+                self.by_drg[drg].append(ind)
+        # Server-side scoring needs the indicator -> DRG mapping; a names-only export has none
+        self.scorable = any(self.by_drg.values())
+        self.version = hashlib.sha1(json.dumps(self.indicators, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.indicators)
+
+    def get(self, name):
+        return self.by_name.get(str(name or '').strip().lower())
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CatalogLoader:
+    def __init__(self, paths, fallback=(), check_interval=None):
+        self.paths = list(paths)
+        self.fallback = list(fallback)
+        self.check_interval = float(check_interval if check_interval is not None else os.getenv('CATALOG_CHECK_INTERVAL', '2'))
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stats = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.current = self._load() or self._load() or Catalog(self.fallback)
+
+    def subscribe(self, fn):
+        """fn(catalog) after every reload."""
+        self._listeners.append(fn)
+
+    def _load(self):
+        stats = tuple(_stat_key(p) for p in self.paths)
+        for path, stat in zip(self.paths, stats):
+            if stat is None:
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                indicators = parse_catalog(raw)
+            except (OSError, CatalogError) as e:
+                print(f"Indicator catalog {path} skipped: {e}")
+                continue
+            if _stat_key(path) != stat:
+                # Rewritten while we read it; keep what we have and look again on the next check
+                return None
+            self._stats = stats
+            return Catalog(indicators, source=path, stat=stat)
+        self._stats = stats
+        return Catalog(self.fallback, source=None)
+
+    def refresh(self, force=False) -> bool:
+        """Reload if a catalog file changed since the last load; True when a new catalog was swapped in."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        with self._lock:
+            if not force and now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+            if not force and tuple(_stat_key(p) for p in self.paths) == self._stats:
+                return False
+            catalog = self._load()
+            if catalog is None:
+                self._stats = None
+                return False
+            if catalog.version == self.current.version:
+                return False
+            self.current = catalog
+            self.reloads += 1
+            # Under the lock so listeners see reloads in order
+            for fn in self._listeners:
+                try:
+                    fn(catalog)
+                except Exception as e:
+                    print(f"Indicator catalog listener error: {e}")
+        return True
@@ -0,0 +1,265 @@
+"""Bulk import and streaming export of company evaluations.
+
+Imports read NDJSON (one company object per line) or CSV (one row per
+company, one column per indicator, or a JSON `scores` column) straight off
+the request stream. Each row is validated against the indicator catalog:
+every score must name a known indicator and lie between 0 and that
+indicator's maximum. Valid rows are scored server-side and committed in
+chunks, each chunk with one journal write (`CompanyStore.put_many`); a bad
+row is reported with its line number and does not stop the import. A row
+with an `id` updates that company (fields it omits are kept), a row without
+one creates a company.
+
+When the catalog cannot score (no indicator-to-DRG mapping), the row's own
+overallScore/perDRG (or drg1-7 CSV columns) are validated and kept instead,
+as the single-company endpoints do; a row with scores but no overallScore is
+rejected rather than stored as 0.
+
+Exports walk the store and yield NDJSON or CSV in chunks (see
+feedback_pages.ndjson_chunks/csv_chunks), so only one chunk of output is
+held at a time. The CSV export re-imports as is.
+"""
+import codecs
+import csv
+import json
+import math
+import os
+
+from scoring import DRG_KEYS
+
+COMPANY_FIELDS = ('name', 'description', 'website', 'lastUpdated')
+# Computed server-side; accepted in input (e.g. a re-imported export), only used when the catalog cannot score
+DERIVED_COLUMNS = ('overallScore', 'perDRG', 'drgScores') + tuple(f'drg{k}' for k in DRG_KEYS)
+EXPORT_COLUMNS = ('id',) + COMPANY_FIELDS + ('overallScore',) + tuple(f'drg{k}' for k in DRG_KEYS)
+IMPORT_CHUNK_SIZE = int(os.getenv('COMPANY_IMPORT_CHUNK_SIZE', '500'))
+IMPORT_MAX_ERRORS = int(os.getenv('COMPANY_IMPORT_MAX_ERRORS', '1000'))
+
+
+class ImportFormatError(ValueError):
+    """Input that cannot be imported at all (e.g. a CSV without a name column)."""
+
+
+def _lines(stream):
+    # Incremental decode so multi-byte characters split across reads survive
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    pending = ''
+    while True:
+        block = stream.read(64 * 1024)
+        pending += decoder.decode(block or b'', final=not block)
+        *lines, pending = pending.split('\n')
+        # Line endings kept: csv needs them inside quoted multi-line fields
+        for line in lines:
+            yield line + '\n'
+        if not block:
+            break
+    if pending:
+        yield pending
+
+
+def iter_ndjson(stream):
+    """(line number, row dict or None, error or None) per non-blank line."""
+    for line_no, line in enumerate(_lines(stream), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, 'expected a JSON object'
+            continue
+        yield line_no, row, None
+
+
+def iter_csv(stream, catalog):
+    """Rows of a CSV import as dicts shaped like the NDJSON ones.
+
+    Returns (ignored column names, row iterator); raises ImportFormatError without a name or id column.
+    """
+    reader = csv.reader(_lines(stream))
+    header = [h.strip() for h in next(reader, [])]
+    if 'name' not in header and 'id' not in header:
+        raise ImportFormatError(f"CSV needs a name (or id) column; found {header}")
+    known = set(COMPANY_FIELDS) | set(DERIVED_COLUMNS) | {'id', 'scores'}
+    indicators = {h: catalog.get(h) for h in header if h not in known}
+    ignored = [h for h, ind in indicators.items() if ind is None and h]
+
+    def rows():
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            if len(values) > len(header):
+                yield reader.line_num, None, f"{len(values)} values for {len(header)} columns"
+                continue
+            row, scores = {}, {}
+            for column, value in zip(header, values):
+                value = value.strip()
+                if column in known:
+                    if value:
+                        row[column] = value
+                elif indicators.get(column) is not None and value:
+                    scores[column] = value
+            if 'scores' in row:
+                try:
+                    row['scores'] = dict(json.loads(row['scores']), **scores)
+                except (ValueError, TypeError):
+                    yield reader.line_num, None, 'scores column is not a JSON object'
+                    continue
+            elif scores:
+                row['scores'] = scores
+            yield reader.line_num, row, None
+
+    return ignored, rows()
+
+
+def validate_scores(scores, catalog) -> dict:
+    """Scores keyed by canonical indicator name; raises ValueError on unknown indicators or out-of-range values."""
+    if not isinstance(scores, dict):
+        raise ValueError('scores must be an object of indicator name -> score')
+    clean = {}
+    for name, value in scores.items():
+        ind = catalog.get(name)
+        if ind is None:
+            raise ValueError(f"unknown indicator {name!r}")
+        canonical = ind['Criterion/Metric Name']
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"score for {canonical!r} is not a number: {value!r}")
+        top = catalog.max_scores.get(canonical)
+        if not math.isfinite(number) or number < 0 or number > top:
+            raise ValueError(f"score for {canonical!r} must be between 0 and {top}, got {value!r}")
+        clean[canonical] = int(number) if number.is_integer() else number
+    return clean
+
+
+def _derived_number(label, value) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} is not a number: {value!r}")
+    if not math.isfinite(number) or number < 0 or number > 10:
+        raise ValueError(f"{label} must be between 0 and 10, got {value!r}")
+    return number
+
+
+def supplied_scores(row) -> dict:
+    """overallScore/perDRG given in a row (NDJSON fields or CSV drg1-7 columns); raises ValueError when invalid."""
+    fields = {}
+    if row.get('overallScore') not in (None, ''):
+        fields['overallScore'] = _derived_number('overallScore', row['overallScore'])
+    per_drg = row.get('perDRG') or row.get('drgScores')
+    if per_drg:
+        if not isinstance(per_drg, dict):
+            raise ValueError('perDRG must be an object of DRG -> score')
+        items = per_drg.items()
+    else:
+        items = [(k, row[f'drg{k}']) for k in DRG_KEYS if row.get(f'drg{k}') not in (None, '')]
+    drg = {}
+    for key, value in items:
+        if str(key) not in DRG_KEYS:
+            raise ValueError(f"unknown DRG {key!r} in perDRG")
+        drg[str(key)] = _derived_number(f"DRG {key} score", value)
+    if drg:
+        fields['perDRG'] = drg
+    return fields
+
+
+def _company_id(row):
+    value = row.get('id')
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"id must be an integer, got {value!r}")
+
+
+def import_companies(rows, store, catalog, score_many=None, chunk_size=None, max_errors=None) -> dict:
+    """Validate and commit `rows` ((line, row, error) triples) in chunks; returns the import report.
+
+    `score_many(list of scores dicts)` returns overallScore/perDRG per entry. Without it (the
+    catalog cannot score) each row's supplied overallScore/perDRG are kept instead.
+    """
+    chunk_size = max(1, chunk_size or IMPORT_CHUNK_SIZE)
+    max_errors = IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    report = {'created': 0, 'updated': 0, 'failed': 0, 'chunks': 0, 'errors': [], 'errors_truncated': False,
+              'scoring': 'computed' if score_many is not None else 'supplied'}
+    new, changes = [], {}
+
+    def fail(line_no, error):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'line': line_no, 'error': error})
+        else:
+            report['errors_truncated'] = True
+
+    def commit():
+        batch = new + list(changes.values())
+        scored = score_many([c['scores'] for c in batch]) if score_many is not None else None
+        for fields, result in zip(batch, scored or ()):
+            if result:
+                fields.update(result)
+        added, updated = store.put_many(new, changes)
+        report['created'] += len(added)
+        report['updated'] += len(updated)
+        report['failed'] += len(changes) - len(updated)
+        report['chunks'] += 1
+        new.clear()
+        changes.clear()
+
+    with store.batch():
+        for line_no, row, error in rows:
+            if error is not None:
+                fail(line_no, error)
+                continue
+            try:
+                company_id = _company_id(row)
+                scores = validate_scores(row['scores'], catalog) if 'scores' in row else None
+                supplied = supplied_scores(row) if score_many is None else {}
+                if score_many is None and scores and 'overallScore' not in supplied:
+                    raise ValueError('overallScore is required: the indicator catalog has no '
+                                     'indicator-to-DRG mapping to score against')
+                if company_id is None:
+                    if not str(row.get('name') or '').strip():
+                        raise ValueError('name is required for a new company')
+                    fields = {'id': None, 'evaluations': [], 'perDRG': {}, 'drgScores': {}, 'overallScore': 0}
+                    fields.update({f: str(row.get(f) or '') for f in COMPANY_FIELDS})
+                    fields['scores'] = scores or {}
+                    fields.update(supplied)
+                    new.append(fields)
+                else:
+                    current = changes.get(company_id) or store.get(company_id)
+                    if current is None:
+                        raise ValueError(f"no company with id {company_id}")
+                    fields = {f: str(row[f]) for f in COMPANY_FIELDS if f in row}
+                    if 'evaluations' in row:
+                        fields['evaluations'] = row['evaluations']
+                    fields['scores'] = scores if scores is not None else current.get('scores', {})
+                    fields.update(supplied)
+                    changes[company_id] = dict(changes.get(company_id) or {}, **fields)
+            except (ValueError, TypeError) as e:
+                fail(line_no, str(e))
+                continue
+            if len(new) + len(changes) >= chunk_size:
+                commit()
+        if new or changes:
+            commit()
+    return report
+
+
+def export_rows(companies, flat=False):
+    """Copies of each company as exported; `flat` spreads scores and perDRG into CSV columns."""
+    for company in companies:
+        row = dict(company)
+        if flat:
+            per_drg = row.get('perDRG') or {}
+            row.update({f'drg{k}': per_drg.get(k) for k in DRG_KEYS})
+            row.update(row.get('scores') or {})
+        yield row
+
+
+def export_columns(catalog) -> list:
+    return list(EXPORT_COLUMNS) + [ind['Criterion/Metric Name'] for ind in catalog.indicators]
@@ -0,0 +1,214 @@
+"""Indexed in-memory company store.
+
+Companies are kept in a dict keyed by id (insertion ordered, so listing order
+matches the old list), with a monotonic id allocator. Lookups, inserts and
+deletes are O(1) regardless of fleet size. When a journal is attached, every
+mutation is appended to it (see journal.py) instead of rewriting the snapshot,
+and `refresh()` picks up mutations made by other worker processes.
+
+Derived structures (scoring matrix, ...) follow the store through
+`subscribe(fn)`; `fn(event, company_id, company)` is called with event
+'put', 'delete' or 'reset' (company_id/company are None on reset), or 'bulk'
+after `update_many` (company_id None, company the {id: fields} applied), which
+listeners can handle with one rebuild instead of a put per company.
+"""
+import threading
+from contextlib import contextmanager
+
+
+class CompanyStore:
+    def __init__(self, companies=None, journal=None):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._next_id = 1
+        self._listeners = []
+        self._generation = 0
+        self.journal = journal
+        if journal is not None:
+            journal.attach(self._lock, self.snapshot, self._apply_record, self._reset)
+            if companies is None:
+                companies = journal.load()
+        self.load(companies or [])
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    @property
+    def version(self) -> str:
+        """Data version for cache keys/ETags; with a journal it is shared by all caught-up workers."""
+        if self.journal is not None:
+            return str(self.journal.generation)
+        return str(self._generation)
+
+    def _notify(self, event, company_id=None, company=None):
+        self._generation += 1
+        for fn in self._listeners:
+            try:
+                fn(event, company_id, company)
+            except Exception as e:
+                print(f"Company store listener error: {e}")
+
+    def load(self, companies):
+        with self._lock:
+            self._by_id = {}
+            for c in companies:
+                if c.get('id') is not None:
+                    self._by_id[c['id']] = c
+            self._next_id = max(self._by_id, default=0) + 1
+            if self.journal is not None:
+                self._next_id = max(self._next_id, self.journal.id_floor)
+
+    def _reset(self, companies):
+        self.load(companies)
+        self._notify('reset')
+
+    def _apply_record(self, record):
+        # Replay of a record written by another process
+        if record.get('op') == 'put':
+            company = record.get('company') or {}
+            cid = company.get('id')
+            if cid is None:
+                return
+            self._by_id[cid] = company
+            if cid >= self._next_id:
+                self._next_id = cid + 1
+            self._notify('put', cid, company)
+        elif record.get('op') == 'delete':
+            if self._by_id.pop(record.get('id'), None) is not None:
+                self._notify('delete', record.get('id'))
+        elif record.get('op') == 'patch':
+            applied = {}
+            for cid, fields in record.get('changes') or ():
+                company = self._by_id.get(cid)
+                if company is not None and isinstance(fields, dict):
+                    company.update(fields)
+                    applied[cid] = fields
+            if applied:
+                self._notify('bulk', None, applied)
+        if self.journal is not None:
+            self._next_id = max(self._next_id, self.journal.id_floor)
+
+    @contextmanager
+    def _writing(self):
+        if self.journal is not None:
+            with self.journal.writing():
+                yield
+        else:
+            with self._lock:
+                yield
+
+    def refresh(self) -> bool:
+        """Pick up changes from other processes (cheap no-op when nothing changed)."""
+        return self.journal.refresh() if self.journal is not None else False
+
+    def allocate_id(self) -> int:
+        with self._writing():
+            new_id = self._next_id
+            self._next_id += 1
+            return new_id
+
+    @contextmanager
+    def batch(self):
+        """Group many writes (bulk import): journal compaction waits until the block ends."""
+        if self.journal is None:
+            yield
+            return
+        with self.journal.deferring_compaction():
+            yield
+
+    def get(self, company_id):
+        return self._by_id.get(company_id)
+
+    def add(self, company):
+        """Insert a company, allocating its id if it has none."""
+        with self._writing():
+            if company.get('id') is None:
+                company['id'] = self.allocate_id()
+            elif company['id'] >= self._next_id:
+                self._next_id = company['id'] + 1
+            self._by_id[company['id']] = company
+            if self.journal is not None:
+                self.journal.put(company)
+            self._notify('put', company['id'], company)
+            return company
+
+    def update(self, company_id, fields):
+        """Apply `fields` to an existing company; returns it, or None if unknown."""
+        return self.put_many((), {company_id: fields})[1].get(company_id)
+
+    def update_many(self, changes):
+        """Apply {id: fields} to many companies (rescore): returns {id: updated company}.
+
+        The journal gets one record with just the given fields, and listeners one
+        'bulk' event, instead of a full record and a 'put' per company.
+        """
+        updated = {}
+        applied = {}
+        with self._writing():
+            for company_id, fields in changes.items():
+                company = self._by_id.get(company_id)
+                if company is None:
+                    continue
+                company.update(fields)
+                updated[company_id] = company
+                applied[company_id] = fields
+            if applied:
+                if self.journal is not None:
+                    self.journal.patch(applied)
+                self._notify('bulk', None, applied)
+        return updated
+
+    def put_many(self, companies=(), changes=None):
+        """Insert `companies` (ids allocated as in `add`) and apply {id: fields}, with a single journal write.
+
+        Returns (added companies, {id: updated company}); changes for unknown ids are skipped.
+        """
+        updated = {}
+        with self._writing():
+            added = []
+            for company in companies:
+                if company.get('id') is None:
+                    company['id'] = self._next_id
+                if company['id'] >= self._next_id:
+                    self._next_id = company['id'] + 1
+                self._by_id[company['id']] = company
+                added.append(company)
+            for company_id, fields in (changes or {}).items():
+                company = self._by_id.get(company_id)
+                if company is None:
+                    continue
+                company.update(fields)
+                updated[company_id] = company
+            if self.journal is not None:
+                self.journal.append_many([{'op': 'put', 'company': c} for c in added + list(updated.values())])
+            for company in added:
+                self._notify('put', company['id'], company)
+            for company_id, company in updated.items():
+                self._notify('put', company_id, company)
+        return added, updated
+
+    def delete(self, company_id):
+        with self._writing():
+            company = self._by_id.pop(company_id, None)
+            if company is not None:
+                if self.journal is not None:
+                    self.journal.delete(company_id)
+                self._notify('delete', company_id)
+            return company
+
+    def values(self) -> list:
+        return list(self._by_id.values())
+
+    def snapshot(self) -> list:
+        """Shallow copies of every company, safe to serialize outside the lock."""
+        with self._lock:
+            return [dict(c) for c in self._by_id.values()]
+
+    def __contains__(self, company_id):
+        return company_id in self._by_id
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self.values())
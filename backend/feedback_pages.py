@@ -0,0 +1,93 @@
+"""Keyset pagination and streaming export over the Supabase `feedback` table.
+
+Pages are ordered newest first on (created_at, id), and a cursor is the
+(created_at, id) of the last row served. The next page asks PostgREST for
+rows strictly after that key, so every page costs the same index range scan
+no matter how deep the admin pages, and rows inserted meanwhile never shift
+or duplicate what was already seen. Exports walk the same pages and yield
+NDJSON or CSV in chunks, so memory stays constant however many rows there are.
+"""
+import base64
+import csv
+import io
+import json
+
+FEEDBACK_COLUMNS = (
+    'id', 'created_at', 'session_id', 'route', 'indicator_name', 'drg_short_code', 'feedback_type',
+    'message', 'assistant_message', 'consent', 'device', 'viewport_w',
+)
+
+
+def encode_feedback_cursor(row) -> str:
+    key = [row.get('created_at'), row.get('id')]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+
+def decode_feedback_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        if not isinstance(created_at, str) or row_id is None:
+            return None
+        return (created_at, row_id)
+    except Exception:
+        return None
+
+
+def _quote(value) -> str:
+    # PostgREST or=(...) values with ':' / '+' / ',' must be double-quoted
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def feedback_page(client, limit=100, cursor=None, route=None, indicator_name=None, table='feedback'):
+    """One page of feedback, newest first; returns (items, next_cursor or None)."""
+    query = client.table(table).select('*').order('created_at', desc=True).order('id', desc=True).limit(limit)
+    if route:
+        query = query.eq('route', route)
+    if indicator_name:
+        query = query.eq('indicator_name', indicator_name)
+    if cursor is not None:
+        created_at, row_id = cursor
+        query = query.or_(f"created_at.lt.{_quote(created_at)},"
+                          f"and(created_at.eq.{_quote(created_at)},id.lt.{_quote(row_id)})")
+    items = getattr(query.execute(), 'data', []) or []
+    next_cursor = encode_feedback_cursor(items[-1]) if len(items) == limit else None
+    return items, next_cursor
+
+
+def iter_feedback(client, page_size=1000, route=None, indicator_name=None, table='feedback'):
+    cursor = None
+    while True:
+        items, next_cursor = feedback_page(client, page_size, cursor, route, indicator_name, table)
+        yield from items
+        if next_cursor is None:
+            return
+        cursor = decode_feedback_cursor(next_cursor)
+
+
+def ndjson_chunks(rows, chunk_rows=500):
+    buf = []
+    for row in rows:
+        buf.append(json.dumps(row, ensure_ascii=False, default=str))
+        if len(buf) >= chunk_rows:
+            yield '\n'.join(buf) + '\n'
+            buf = []
+    if buf:
+        yield '\n'.join(buf) + '\n'
+
+
+def csv_chunks(rows, columns=FEEDBACK_COLUMNS, chunk_rows=500):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(columns), extrasaction='ignore')
+    writer.writeheader()
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+        if n >= chunk_rows:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+            n = 0
+    if out.tell():
+        yield out.getvalue()
@@ -0,0 +1,245 @@
+"""Batched feedback ingestion: validate, acknowledge, bulk-insert in the background.
+
+POST /api/feedback only validates the record and hands it to the queue. A
+background thread flushes to Supabase in one `insert([...])` per batch,
+either when `batch_size` records are waiting or every `flush_interval`
+seconds. If an insert fails the batch is appended to a local spool file
+(JSON lines, shared by all workers under a file lock) and the backend is
+retried with exponential backoff; once an insert succeeds again the spool
+is replayed and removed. A queue created while a spool file exists (a worker
+restarted after an outage) starts its flusher right away, so the spool is
+replayed without waiting for new feedback. Delivery is at-least-once: a batch that failed
+after Supabase actually stored it is sent again on replay. Records still in
+memory are flushed (or spooled) at interpreter exit; a hard kill loses at
+most one flush interval.
+
+The client only needs `client.table(name).insert(rows).execute()`, so a
+local stand-in can replace the real `supabase` client. It may also be given
+as a zero-argument function returning the client (e.g. `Lazy.get`), which is
+called by the flusher, so building the client never delays a request.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+from journal import _FileLock
+
+REQUIRED_FIELDS = ('session_id', 'route', 'message')
+
+
+def feedback_record(payload) -> dict:
+    """Normalise a POSTed feedback payload; raises ValueError when required fields are missing."""
+    if not all(payload.get(field) for field in REQUIRED_FIELDS):
+        raise ValueError('Missing required fields')
+    return {
+        'session_id': str(payload['session_id'])[:128],
+        'route': str(payload['route'])[:256],
+        'indicator_name': (payload.get('indicator_name') or None),
+        'drg_short_code': (payload.get('drg_short_code') or None),
+        'feedback_type': (payload.get('feedback_type') or 'general'),
+        'message': str(payload['message'])[:6000],
+        'assistant_message': (str(payload.get('assistant_message') or '')[:6000] or None),
+        'consent': bool(payload.get('consent', False)),
+        'device': (payload.get('device') or None),
+        'viewport_w': int(payload.get('viewport_w') or 0) or None,
+    }
+
+
+def _read_spool(path):
+    records = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn write from a crashed worker; the rest of the file is intact
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+class FeedbackQueue:
+    def __init__(self, client, table='feedback', spool_path=None, batch_size=None, flush_interval=None,
+                 max_backoff=60.0, observer=None):
+        self.client = client
+        # observer('supabase', 'ok' | 'error', seconds) after every bulk insert
+        self.observer = observer
+        self.table = table
+        self.spool_path = spool_path or os.getenv('FEEDBACK_SPOOL_PATH', 'feedback_spool.jsonl')
+        self.batch_size = max(1, int(batch_size if batch_size is not None else os.getenv('FEEDBACK_BATCH_SIZE', '50')))
+        self.flush_interval = float(flush_interval if flush_interval is not None else os.getenv('FEEDBACK_FLUSH_INTERVAL', '2'))
+        self.max_backoff = max_backoff
+        self._spool_lock = _FileLock(f"{self.spool_path}.lock")
+        self._cond = threading.Condition()
+        self._buffer = []
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self.submitted = 0
+        self.inserted = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.failures = 0
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        self._start_if_spooled()
+
+    def _start_if_spooled(self):
+        if os.path.exists(self.spool_path):
+            self._ensure_thread()
+
+    def _after_fork(self):
+        # The parent's flusher (and whatever it held) did not survive the fork; the buffer is the parent's
+        self._cond = threading.Condition()
+        self._buffer = []
+        self._thread = None
+        self._start_if_spooled()
+
+    def submit(self, record):
+        with self._cond:
+            self._buffer.append(record)
+            self.submitted += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        # Started lazily and per process, so a fork (gunicorn --preload) gets its own flusher
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='feedback-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                batch, self._buffer = self._buffer, []
+                stopped = self._stopped
+            try:
+                self.flush(batch)
+            except Exception as e:
+                print(f"Feedback flush error: {e}")
+                self._spool(batch)
+            if stopped:
+                return
+
+    def flush(self, records=()):
+        """Replay the spool if the backend looks healthy, then insert `records` in batches."""
+        records = list(records)
+        if time.monotonic() < self._retry_at or not self._replay():
+            self._spool(records)
+            return
+        for start in range(0, len(records), self.batch_size):
+            if not self._insert(records[start:start + self.batch_size]):
+                self._spool(records[start:])
+                return
+
+    def _insert(self, rows) -> bool:
+        started = time.perf_counter()
+        try:
+            client = self.client() if callable(self.client) else self.client
+            if client is None:
+                raise RuntimeError('feedback backend unavailable')
+            client.table(self.table).insert(rows).execute()
+        except Exception as e:
+            if self.observer is not None:
+                self.observer('supabase', 'error', time.perf_counter() - started)
+            self.failures += 1
+            self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+            self._retry_at = time.monotonic() + self._backoff
+            print(f"Feedback insert error ({len(rows)} records spooled, retry in {self._backoff:.0f}s): {e}")
+            return False
+        if self.observer is not None:
+            self.observer('supabase', 'ok', time.perf_counter() - started)
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self.inserted += len(rows)
+        return True
+
+    def _spool(self, records):
+        if not records:
+            return
+        data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8')
+        with self._spool_lock():
+            with open(self.spool_path, 'ab+') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        data = b'\n' + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        self.spooled += len(records)
+
+    def _replay(self) -> bool:
+        """Send spooled records; True once the spool is empty."""
+        if not os.path.exists(self.spool_path):
+            return True
+        with self._spool_lock():
+            records = _read_spool(self.spool_path)
+            sent = 0
+            while sent < len(records) and self._insert(records[sent:sent + self.batch_size]):
+                sent += len(records[sent:sent + self.batch_size])
+            if sent == len(records):
+                try:
+                    os.remove(self.spool_path)
+                except FileNotFoundError:
+                    pass
+            elif sent:
+                tmp = f"{self.spool_path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + '\n' for r in records[sent:])
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.spool_path)
+            self.replayed += sent
+            return sent == len(records)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.pending(),
+            'submitted': self.submitted,
+            'inserted': self.inserted,
+            'spooled': self.spooled,
+            'replayed': self.replayed,
+            'failures': self.failures,
+            'spool_exists': os.path.exists(self.spool_path),
+        }
+
+    def close(self, timeout=10.0):
+        """Stop the flusher after a final flush; records it cannot insert go to the spool."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+            return
+        with self._cond:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            try:
+                self.flush(batch)
+            except Exception:
+                self._spool(batch)
@@ -0,0 +1,38 @@
+"""Gunicorn configuration for the backend (`gunicorn -c gunicorn.conf.py app:app`, run from backend/).
+
+The slow routes (/api/llm/chat, /api/llm-explain, /api/feedback) spend nearly
+all their time waiting on OpenAI, Vertex or Supabase. With the default `sync`
+worker each of those waits pins a whole process, so a few slow LLM calls
+starve the cheap GETs. The default here is `gthread`: every process serves
+GUNICORN_THREADS requests concurrently, and blocked upstream I/O releases the
+GIL, so a handful of processes can hold hundreds of open chats.
+
+Environment:
+  WEB_CONCURRENCY          worker processes (default: CPU count, max 8)
+  GUNICORN_WORKER_CLASS    gthread (default) | sync | gevent (needs `pip install gevent`)
+  GUNICORN_THREADS         threads per gthread worker (default 64)
+  GUNICORN_TIMEOUT         worker timeout in seconds (default 60; SSE streams need > upstream time)
+  PORT                     bind port (default 5000)
+  TRUSTED_PROXY_HOPS       reverse proxies in front of gunicorn whose X-Forwarded-For
+                           entries are trusted (default 0). Set it only when every request
+                           arrives through that many proxies: with gunicorn reachable
+                           directly, a client could send any X-Forwarded-For and get a
+                           fresh rate-limit bucket per request.
+
+Chat rate limits (CHAT_*_RATE_PER_MIN) are kept per worker process, so the
+effective limit is the configured rate times WEB_CONCURRENCY.
+
+Keep OPENAI_POOL_SIZE >= GUNICORN_THREADS so chats don't queue for a pooled connection.
+Shared state is safe across threads (locks in the store, caches and clients)
+and across processes (see journal.py).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count(), 8))))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '64'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
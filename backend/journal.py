@@ -0,0 +1,391 @@
+"""Append-only journal persistence for companies.
+
+Each mutation appends one JSON line to `<snapshot>.journal` instead of
+rewriting the whole snapshot, so write cost tracks the size of the change.
+Once enough records accumulate, a background thread compacts: the journal is
+rotated to `.journal.1`, a fresh snapshot is written to a temp file and
+atomically renamed over the old one, then the rotated journal is dropped.
+
+Startup replays snapshot -> `.journal.1` -> `.journal`. Records are whole
+company puts, deletes, or 'patch' records carrying just the changed fields of
+many companies (a rescore), so replaying a rotated journal that is already
+contained in the snapshot is harmless, and a torn last line is skipped.
+Compaction starts the new journal with a 'meta' record carrying the id
+high-water mark, so ids of deleted companies are never handed out again, and
+the generation: a counter of every record ever written, which the meta record
+carries past the compaction. It only moves forward and every caught-up worker
+agrees on it, so it is the data version behind cache keys and ETags.
+
+The same files keep several gunicorn workers coherent. Writers take an
+exclusive flock on `<snapshot>.lock` and first catch up on records appended
+by other workers. Readers call `refresh()` per request: one small read of
+the journal's head plus its size, compared with what this worker last
+consumed. The head's meta record names the journal by generation (a fresh
+journal after every compaction, never reused, unlike inode numbers). Only
+when the stamp moved does the worker tail the new journal bytes, or reload
+fully if another worker compacted in between.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to process-local locking
+    fcntl = None
+
+# Enough of the journal's first line to hold a compaction's meta record
+HEADER_BYTES = 256
+
+
+def write_snapshot(path, companies):
+    """Atomically replace `path` with the given companies list."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(companies, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _parse_lines(data):
+    for line in data.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # Torn write from a crash; everything before it is intact
+            continue
+
+
+def _read_records(path):
+    try:
+        with open(path, 'rb') as f:
+            return list(_parse_lines(f.read().decode('utf-8', errors='replace')))
+    except FileNotFoundError:
+        return []
+
+
+def _header_generation(head):
+    """Generation in a journal's leading meta record; None for a journal that was never compacted."""
+    line = head.split(b'\n', 1)[0]
+    if not line.startswith(b'{"op":"meta"'):
+        return None
+    try:
+        return int(json.loads(line).get('generation') or 0)
+    except ValueError:
+        return None
+
+
+def apply_record(by_id, record):
+    """Apply one record to an {id: company} dict ('meta' records carry no company data)."""
+    op = record.get('op')
+    if op == 'put':
+        company = record.get('company') or {}
+        if company.get('id') is not None:
+            by_id[company['id']] = company
+    elif op == 'delete':
+        by_id.pop(record.get('id'), None)
+    elif op == 'patch':
+        for company_id, fields in record.get('changes') or ():
+            if company_id in by_id and isinstance(fields, dict):
+                by_id[company_id].update(fields)
+
+
+def _weight(record) -> int:
+    # Companies a record touches; a patch counts per company toward compaction
+    if record.get('op') == 'patch':
+        return max(1, len(record.get('changes') or ()))
+    return 1
+
+
+class _FileLock:
+    """flock on a side file; re-entrant per thread so nested sections don't self-deadlock."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._fallback = threading.RLock()
+
+    @contextmanager
+    def __call__(self, exclusive=True):
+        if getattr(self._local, 'depth', 0):
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        if fcntl is None:
+            with self._fallback:
+                self._local.depth = 1
+                try:
+                    yield
+                finally:
+                    self._local.depth = 0
+            return
+        with open(self.path, 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._local.depth = 1
+            try:
+                yield
+            finally:
+                self._local.depth = 0
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CompanyJournal:
+    def __init__(self, snapshot_path='companies.json', compact_every=None, fsync=None):
+        self.snapshot_path = snapshot_path
+        self.path = f"{snapshot_path}.journal"
+        self.rotated_path = f"{self.path}.1"
+        self.compact_every = int(compact_every if compact_every is not None else os.getenv('COMPANIES_COMPACT_EVERY', '1000'))
+        self.fsync = (os.getenv('COMPANIES_JOURNAL_FSYNC', '0') == '1') if fsync is None else fsync
+        self.file_lock = _FileLock(f"{snapshot_path}.lock")
+        self._lock = threading.RLock()
+        self._compacting = threading.Lock()
+        self._deferred = 0
+        self._fh = None
+        self.records = 0
+        # Monotonic data version: meta generation plus the records replayed after it
+        self.generation = 0
+        # Write/compaction timings (this process), exported by /metrics
+        self.writes = 0
+        self.write_seconds = 0.0
+        self.compactions = 0
+        self.last_compact_seconds = 0.0
+        # What this process has consumed of the journal: its header generation, the end of
+        # the last complete record and the bytes seen (None while there is no journal)
+        self._head = None
+        self._offset = 0
+        self._size = None
+        # Lowest id that may be allocated next (survives deletes folded away by compaction)
+        self.id_floor = 0
+        self.snapshot_fn = None
+        self.apply_fn = None
+        self.reset_fn = None
+
+    def attach(self, lock, snapshot_fn, apply_fn=None, reset_fn=None):
+        """Bind to the owning store: shared lock, snapshot source and replay callbacks."""
+        self._lock = lock
+        self.snapshot_fn = snapshot_fn
+        self.apply_fn = apply_fn
+        self.reset_fn = reset_fn
+
+    def _track(self, record):
+        op = record.get('op')
+        if op == 'meta':
+            self.id_floor = max(self.id_floor, int(record.get('next_id') or 0))
+            self.generation = max(self.generation, int(record.get('generation') or 0))
+            return
+        self.generation += 1
+        if op == 'delete' and isinstance(record.get('id'), int):
+            self.id_floor = max(self.id_floor, record['id'] + 1)
+
+    # --- reading ---
+    def load(self) -> list:
+        """Snapshot plus replayed journal records, in listing order."""
+        with self.file_lock(exclusive=False):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    companies = json.load(f)
+            except FileNotFoundError:
+                companies = []
+            by_id = {c['id']: c for c in companies if c.get('id') is not None}
+            self.records = 0
+            self.id_floor = 0
+            self.generation = 0
+            self._head, self._offset, self._size = None, 0, None
+            for record in _read_records(self.rotated_path) + self._read_tail():
+                apply_record(by_id, record)
+                self._track(record)
+                self.records += _weight(record)
+            return list(by_id.values())
+
+    def _read_tail(self):
+        """Complete records appended since our offset; advances the offset."""
+        try:
+            with open(self.path, 'rb') as f:
+                if not self._offset:
+                    self._head = _header_generation(f.read(HEADER_BYTES))
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            self._size = None
+            return []
+        # A torn last line counts as seen (it is skipped, not retried) so it doesn't read as
+        # a change on every request; the next append terminates it and we parse past it
+        self._size = self._offset + len(data)
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        return list(_parse_lines(data[:end].decode('utf-8', errors='replace')))
+
+    def _stamp(self):
+        """(header generation, size) of the journal file; (None, None) when there is none."""
+        try:
+            with open(self.path, 'rb') as f:
+                return _header_generation(f.read(HEADER_BYTES)), os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return None, None
+
+    def changed(self) -> bool:
+        """Cheap check (one small read) whether another process touched the journal since we last looked."""
+        return self._stamp() != (self._head, self._size)
+
+    def refresh(self) -> bool:
+        """Bring the attached store up to date with other processes; True if anything was applied."""
+        if not self.changed():
+            return False
+        with self.file_lock(exclusive=False):
+            return self._catch_up()
+
+    def _catch_up(self) -> bool:
+        # Caller holds the file lock
+        with self._lock:
+            head, size = self._stamp()
+            if (head, size) == (self._head, self._size):
+                return False
+            if size is not None and head == self._head and size >= self._offset:
+                records = self._read_tail()
+                for record in records:
+                    self._track(record)
+                    if self.apply_fn is not None:
+                        self.apply_fn(record)
+                self.records += sum(_weight(r) for r in records)
+                return bool(records)
+            # Another worker compacted (or the files were replaced): reload from scratch
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            companies = self.load()
+            if self.reset_fn is not None:
+                self.reset_fn(companies)
+            return True
+
+    # --- writing ---
+    @contextmanager
+    def writing(self):
+        """Exclusive cross-process write section, caught up with every other writer.
+
+        Lock order is always file lock -> store lock.
+        """
+        with self.file_lock(exclusive=True):
+            self._catch_up()
+            with self._lock:
+                yield
+
+    def _open(self):
+        if self._fh is None:
+            self._fh = open(self.path, 'ab')
+            if self._fh.tell() > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        # Terminate a torn record so the next append starts on a clean line
+                        self._fh.write(b'\n')
+        return self._fh
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        if not records:
+            return
+        data = ''.join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + '\n' for r in records)
+        started = time.perf_counter()
+        with self.writing():
+            fh = self._open()
+            encoded = data.encode('utf-8')
+            if not fh.tell():
+                self._head = _header_generation(encoded[:HEADER_BYTES])
+            fh.write(encoded)
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+            for record in records:
+                self._track(record)
+            # Our own records are already applied in memory; just move past them
+            self._offset = self._size = fh.tell()
+            self.records += sum(_weight(r) for r in records)
+            due = self.compact_every > 0 and self.records >= self.compact_every
+            self.writes += 1
+            self.write_seconds += time.perf_counter() - started
+        if due and not self._deferred:
+            self.compact_async()
+
+    @contextmanager
+    def deferring_compaction(self):
+        """Hold off compaction for the block (bulk imports), then compact once if it came due.
+
+        Compacting every `compact_every` records of a large import would rewrite the growing
+        snapshot over and over while the import waits on the file lock.
+        """
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                due = not self._deferred and self.compact_every > 0 and self.records >= self.compact_every
+            if due:
+                self.compact_async()
+
+    def put(self, company):
+        self.append({'op': 'put', 'company': company})
+
+    def delete(self, company_id):
+        self.append({'op': 'delete', 'id': company_id})
+
+    def patch(self, changes):
+        """One record for {id: fields} applied to many companies (only the changed fields)."""
+        self.append({'op': 'patch', 'changes': [[company_id, fields] for company_id, fields in changes.items()]})
+
+    # --- compaction ---
+    def compact_async(self):
+        if self.snapshot_fn is None or self._compacting.locked():
+            return
+        threading.Thread(target=self.compact, name='companies-compact', daemon=True).start()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot. `snapshot_fn` returns the current companies."""
+        if self.snapshot_fn is None or not self._compacting.acquire(blocking=False):
+            return
+        started = time.perf_counter()
+        try:
+            with self.file_lock(exclusive=True):
+                self._catch_up()
+                with self._lock:
+                    companies = self.snapshot_fn()
+                    if self._fh is not None:
+                        self._fh.close()
+                        self._fh = None
+                    if os.path.exists(self.path):
+                        if os.path.exists(self.rotated_path):
+                            # A previous compaction died before finishing; keep its records
+                            with open(self.path, 'rb') as src, open(self.rotated_path, 'ab') as dst:
+                                dst.write(b'\n' + src.read())
+                            os.remove(self.path)
+                        else:
+                            os.replace(self.path, self.rotated_path)
+                    self.records = 0
+                    self._head, self._offset, self._size = None, 0, None
+                    next_id = max([self.id_floor] + [c['id'] + 1 for c in companies if isinstance(c.get('id'), int)])
+                    # Past every generation handed out so far, so no earlier version comes back
+                    self.append({'op': 'meta', 'next_id': next_id, 'generation': self.generation + 1})
+                # Serialize outside the store lock; writers still queue on the file lock
+                write_snapshot(self.snapshot_path, companies)
+                try:
+                    os.remove(self.rotated_path)
+                except FileNotFoundError:
+                    pass
+            self.compactions += 1
+            self.last_compact_seconds = time.perf_counter() - started
+        except Exception as e:
+            print(f"Error compacting companies journal: {e}")
+        finally:
+            self._compacting.release()
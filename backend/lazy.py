@@ -0,0 +1,69 @@
+"""Thread-safe lazy initialization (Supabase client, Vertex AI model, scoring engine).
+
+Importing an SDK and building its client can cost more than the whole rest
+of app start-up, and a worker that never serves chat or feedback should not
+pay it; the same goes for the numpy scoring engine on a worker that only
+serves reads. `Lazy(factory)` runs `factory()` once, on the first `get()`;
+concurrent first callers wait for that single run. A factory that raises
+counts as "not available": `get()` returns None from then on, like the old
+import-time try/except did.
+
+State is per process: a Lazy that was mid-initialization when gunicorn
+forked starts over in the child instead of waiting on a lock no thread will
+release. `prewarm_async` initializes in a background thread so the first
+request doesn't wait either.
+"""
+import os
+import threading
+import time
+
+
+class Lazy:
+    def __init__(self, factory, name=None):
+        self.factory = factory
+        self.name = name or getattr(factory, '__name__', 'lazy')
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._loaded = False
+        self._value = None
+        self.error = None
+        self.load_seconds = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+        with self._lock:
+            if self._loaded:
+                return self._value
+            started = time.perf_counter()
+            try:
+                self._value = self.factory()
+            except Exception as e:
+                self._value = None
+                self.error = str(e)
+                print(f"{self.name} unavailable: {e}")
+            self.load_seconds = time.perf_counter() - started
+            self._loaded = True
+            return self._value
+
+    def state(self) -> str:
+        if not self._loaded:
+            return 'pending'
+        return 'ready' if self._value is not None else 'unavailable'
+
+
+def prewarm_async(lazies):
+    """Initialize each Lazy in a background thread; returns the thread."""
+    def run():
+        for lazy in lazies:
+            lazy.get()
+    thread = threading.Thread(target=run, name='lazy-prewarm', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,131 @@
+"""Incrementally ordered leaderboard over the company store.
+
+One sorted list per sort key (overall and DRG 1-7) holds (-score, id)
+tuples. Add/update/delete events from the store move a single entry, so a
+company's rank is one bisect and a page of the top-N is a bisect plus a
+slice, instead of sorting and shipping the whole fleet per request.
+"""
+import base64
+import bisect
+import json
+import math
+import threading
+
+from scoring import DRG_KEYS
+
+SORT_KEYS = ['overall'] + DRG_KEYS
+
+
+def normalize_sort_key(value) -> str:
+    """'overall', '3', 'drg3', 'DRG 3' -> canonical key; None if unknown."""
+    key = str(value or 'overall').strip().lower().replace(' ', '')
+    if key.startswith('drg'):
+        key = key[3:].lstrip('#')
+    return key if key in SORT_KEYS else None
+
+
+def _float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def score_for(company, key) -> float:
+    if key == 'overall':
+        return _float(company.get('overallScore'))
+    return _float((company.get('perDRG') or company.get('drgScores') or {}).get(key))
+
+
+def scores_for(company) -> list:
+    """score_for every key in SORT_KEYS order, looking up the DRG map once (rebuilds)."""
+    drg = company.get('perDRG') or company.get('drgScores') or {}
+    return [_float(company.get('overallScore'))] + [_float(drg.get(k)) for k in DRG_KEYS]
+
+
+def encode_cursor(entry) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(entry)).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(-score, company id) from a page cursor; None unless it has exactly that shape."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        neg_score, company_id = json.loads(raw)
+        neg_score = float(neg_score)
+    except Exception:
+        return None
+    # Compared against (float, int) entries with bisect: anything else would raise there
+    if not math.isfinite(neg_score) or type(company_id) is not int:
+        return None
+    return (neg_score, company_id)
+
+
+class Leaderboard:
+    def __init__(self, companies=None):
+        self._lock = threading.RLock()
+        self._sorted = {k: [] for k in SORT_KEYS}
+        self._entry = {}
+        self.rebuild(companies or [])
+
+    def rebuild(self, companies):
+        with self._lock:
+            self._entry = {}
+            lists = [[] for _ in SORT_KEYS]
+            for c in companies:
+                cid = c.get('id')
+                if cid is None:
+                    continue
+                for k, lst, score in zip(SORT_KEYS, lists, scores_for(c)):
+                    entry = (-score, cid)
+                    self._entry[(k, cid)] = entry
+                    lst.append(entry)
+            for k, lst in zip(SORT_KEYS, lists):
+                lst.sort()
+                self._sorted[k] = lst
+
+    def _remove(self, company_id):
+        for k in SORT_KEYS:
+            entry = self._entry.pop((k, company_id), None)
+            if entry is None:
+                continue
+            lst = self._sorted[k]
+            i = bisect.bisect_left(lst, entry)
+            if i < len(lst) and lst[i] == entry:
+                del lst[i]
+
+    def put(self, company):
+        with self._lock:
+            self._remove(company['id'])
+            for k in SORT_KEYS:
+                entry = (-score_for(company, k), company['id'])
+                self._entry[(k, company['id'])] = entry
+                bisect.insort(self._sorted[k], entry)
+
+    def delete(self, company_id):
+        with self._lock:
+            self._remove(company_id)
+
+    def __len__(self):
+        return len(self._sorted['overall'])
+
+    def page(self, key='overall', limit=50, cursor=None):
+        """[(rank, company_id)] after `cursor`, plus the cursor for the next page (or None)."""
+        with self._lock:
+            lst = self._sorted[key]
+            start = 0
+            if cursor is not None:
+                start = bisect.bisect_right(lst, cursor)
+            chunk = lst[start:start + limit]
+            # Competition ranking: ties share the rank of the first entry with that score
+            items = [(bisect.bisect_left(lst, (neg,)) + 1, cid) for neg, cid in chunk]
+            has_more = start + limit < len(lst)
+        next_cursor = encode_cursor(chunk[-1]) if chunk and has_more else None
+        return items, next_cursor
+
+    def rank(self, company_id, key='overall'):
+        with self._lock:
+            entry = self._entry.get((key, company_id))
+            if entry is None:
+                return None
+            return bisect.bisect_left(self._sorted[key], (entry[0],)) + 1
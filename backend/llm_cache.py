@@ -0,0 +1,143 @@
+"""Two-level cache for LLM explanations: in-memory LRU with TTL over an on-disk SQLite store.
+
+Keys are a hash of the prompt inputs plus the model name, so a changed
+rationale, scoring logic or model never serves a stale answer. The SQLite
+file survives restarts and is shared by all workers on the host, which is
+also where the workers agree on who runs a warm-up (`claim`/`finish`).
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(model, *parts) -> str:
+    h = hashlib.sha256(str(model).encode('utf-8'))
+    for part in parts:
+        h.update(b'\0')
+        h.update(str(part or '').encode('utf-8'))
+    return h.hexdigest()
+
+
+class ExplanationCache:
+    def __init__(self, path=None, max_entries=None, ttl=None):
+        self.path = path if path is not None else os.getenv('LLM_CACHE_PATH', 'llm_cache.sqlite3')
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv('LLM_CACHE_MAX_ENTRIES', '1024'))
+        self.ttl = float(ttl if ttl is not None else os.getenv('LLM_CACHE_TTL', str(30 * 24 * 3600)))
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if self.path:
+            try:
+                self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute('CREATE TABLE IF NOT EXISTS explanations (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)')
+                self._db.execute('CREATE TABLE IF NOT EXISTS claims (name TEXT PRIMARY KEY, claimed REAL NOT NULL, done INTEGER NOT NULL)')
+                self._db.commit()
+            except Exception as e:
+                print(f"LLM cache disk store disabled: {e}")
+                self._db = None
+
+    def _remember(self, key, value, created):
+        self._mem[key] = (value, created)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            cached = self._mem.get(key)
+            if cached is not None:
+                if now - cached[1] < self.ttl:
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return cached[0]
+                del self._mem[key]
+            if self._db is not None:
+                try:
+                    row = self._db.execute('SELECT value, created FROM explanations WHERE key = ?', (key,)).fetchone()
+                except Exception:
+                    row = None
+                if row and now - row[1] < self.ttl:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is not None:
+                try:
+                    self._db.execute('INSERT OR REPLACE INTO explanations (key, value, created) VALUES (?, ?, ?)', (key, value, now))
+                    self._db.commit()
+                except Exception as e:
+                    print(f"LLM cache write error: {e}")
+
+    def claim(self, name, stale_after=3600) -> bool:
+        """True for the one worker on this host that gets to run `name` (a warm-up).
+
+        The claim is free again once it is `stale_after` seconds old without being
+        finished (its worker died), or `ttl` seconds after it was finished.
+        Without a disk store every process claims for itself.
+        """
+        if self._db is None:
+            return True
+        now = time.time()
+        with self._lock:
+            try:
+                cur = self._db.execute(
+                    'INSERT INTO claims (name, claimed, done) VALUES (?, ?, 0) '
+                    'ON CONFLICT(name) DO UPDATE SET claimed = excluded.claimed, done = 0 '
+                    'WHERE claims.claimed < CASE WHEN claims.done THEN ? ELSE ? END',
+                    (name, now, now - self.ttl, now - stale_after))
+                self._db.commit()
+                return cur.rowcount == 1
+            except Exception as e:
+                print(f"LLM cache claim error: {e}")
+                return True
+
+    def finish(self, name):
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                self._db.execute('UPDATE claims SET done = 1, claimed = ? WHERE name = ?', (time.time(), name))
+                self._db.commit()
+            except Exception as e:
+                print(f"LLM cache claim error: {e}")
+
+    def __len__(self):
+        return len(self._mem)
+
+
+def warm_up_async(items, explain_fn, cache=None, name=None, stale_after=3600):
+    """Precompute explanations in a background thread; `explain_fn(item)` fills the cache.
+
+    With `cache` and `name`, only the worker that wins `cache.claim(name)` runs it, so N
+    workers starting together make one round of LLM calls, not N. The claim is marked
+    finished only when every item produced an explanation; otherwise it goes stale and a
+    later start retries.
+    """
+    def run():
+        if cache is not None and name and not cache.claim(name, stale_after):
+            return
+        complete = True
+        for item in items:
+            try:
+                complete = bool(explain_fn(item)) and complete
+            except Exception as e:
+                complete = False
+                print(f"LLM explain warm-up error: {e}")
+        if complete and cache is not None and name:
+            cache.finish(name)
+    thread = threading.Thread(target=run, name='llm-explain-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,114 @@
+"""Aho–Corasick keyword matcher for indicator names and DRG keywords in chat messages.
+
+The automaton is built once per catalog. `find_all` makes a single pass
+over the (lower-cased, whitespace-collapsed) message regardless of how many
+patterns exist, and resolves overlaps leftmost-longest, so "Privacy
+Governance & Accountability" wins over the bare DRG keyword "privacy".
+"""
+from collections import deque, namedtuple
+
+from scoring import DRG_KEYS
+
+Match = namedtuple('Match', 'start end phrase payload')
+
+DRG_KEYWORDS = {
+    '1': ['digital literacy'],
+    '2': ['cybersecurity', 'cyber security'],
+    '3': ['privacy'],
+    '4': ['data fairness'],
+    '5': ['trustworthy algorithm', 'trustworthy algorithms'],
+    '6': ['transparency'],
+    '7': ['human agency', 'human agency and identity'],
+}
+
+
+def normalize(text) -> str:
+    return ' '.join(str(text or '').lower().split())
+
+
+def _is_word_char(ch) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    def __init__(self, patterns=()):
+        # Trie nodes: transitions, failure link, and (length, phrase, payload) of the
+        # longest pattern ending exactly here; `_dict` links to the next node with an output
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+        self._dict = [0]
+        for phrase, payload in patterns:
+            self._add(normalize(phrase), payload)
+        self._build()
+
+    def _add(self, phrase, payload):
+        if not phrase:
+            return
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._dict.append(0)
+                self._goto[node][ch] = nxt
+            node = nxt
+        if self._out[node] is None:
+            self._out[node] = (len(phrase), phrase, payload)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._dict[nxt] = target if self._out[target] is not None else self._dict[target]
+                queue.append(nxt)
+
+    def find_all(self, text) -> list:
+        """Non-overlapping whole-word matches, leftmost first, longest at each start."""
+        text = normalize(text)
+        candidates = []
+        node = 0
+        goto, fail, out, links = self._goto, self._fail, self._out, self._dict
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node if out[node] is not None else links[node]
+            while hit:
+                length, phrase, payload = out[hit]
+                start = i - length + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and \
+                        (i + 1 == len(text) or not _is_word_char(text[i + 1])):
+                    candidates.append(Match(start, i + 1, phrase, payload))
+                hit = links[hit]
+        candidates.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        matches, last_end = [], 0
+        for m in candidates:
+            if m.start >= last_end:
+                matches.append(m)
+                last_end = m.end
+        return matches
+
+
+def build_chat_matcher(indicators) -> KeywordMatcher:
+    """Indicator names -> ('indicator', indicator); DRG names/numbers -> ('drg', '<n>')."""
+    patterns = []
+    for ind in indicators:
+        name = str(ind.get('Criterion/Metric Name') or '').strip()
+        if name:
+            patterns.append((name, ('indicator', ind)))
+    for num in DRG_KEYS:
+        for variant in (f'drg{num}', f'drg {num}', f'drg#{num}', f'drg #{num}', f'drg# {num}', f'drg # {num}'):
+            patterns.append((variant, ('drg', num)))
+        for keyword in DRG_KEYWORDS.get(num, []):
+            patterns.append((keyword, ('drg', num)))
+    return KeywordMatcher(patterns)
@@ -0,0 +1,201 @@
+"""Chat prompt assembly under a token budget.
+
+Static context (DRG summaries, one snippet per indicator, and BM25 passages
+of site_context.md, drg_context.md and the indicator rows) is rendered once,
+with its token estimate, when the catalog loads. Per request the builder
+only picks pieces: the system prompt, context line and latest user message
+always go in; optional context, including the passages retrieved for the
+latest message, is added in priority order while it fits; the remaining
+budget is filled with conversation history, newest first. The budget scales
+with the reply's `max_tokens`, so short answers get short prompts.
+"""
+import os
+
+from retrieval import BM25Index, Passage, chunk_markdown
+
+
+def estimate_tokens(text) -> int:
+    # ~4 characters per token for English prose; cheap and dependency-free
+    return (len(text) + 3) // 4 + 4
+
+
+def indicator_snippet(ind) -> str:
+    """Question/rationale/scoring/legend summary of one catalog indicator."""
+    name = str(ind.get('Criterion/Metric Name') or '')
+    q = str(ind.get('Question') or '')[:400]
+    r = str(ind.get('Rationale') or '')[:400]
+    s = str(ind.get('Scoring Logic') or '')[:400]
+    lg = str(ind.get('Legend') or '')[:400]
+    drg = str(ind.get('DRG') or ind.get('DRG Short Code') or '')
+    parts = [
+        f"Indicator: {name}" + (f" (DRG {drg})" if drg else ''),
+    ]
+    if q:
+        parts.append(f"Question: {q}")
+    if r:
+        parts.append(f"Rationale: {r}")
+    if s:
+        parts.append(f"Scoring: {s}")
+    if lg:
+        parts.append(f"Legend: {lg}")
+    return "\n".join(parts)[:1500]
+
+
+class Snippet:
+    __slots__ = ('text', 'tokens')
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+
+INDICATOR_NOTE = Snippet("Indicator context is provided to help tailor your reply. Do not restrict or reprimand users; accept feedback about any part of the evaluation.")
+NO_FOLLOWUP = Snippet("Do not ask any more follow-ups. Respond concisely.")
+RETRIEVED_HEADER = Snippet("Relevant site context:\n")
+
+
+class PromptBuilder:
+    def __init__(self, system_prompt, site_context='', drg_summaries=None, drg_details=None, indicators=(),
+                 budget_ratio=None, min_budget=None, max_budget=None, history_share=None, max_history=None):
+        self.system = Snippet(system_prompt)
+        self.drg_summary = {k: Snippet(f"DRG summary: {v}") for k, v in (drg_summaries or {}).items()}
+        # Long-form DRG text reaches the prompt through retrieval, passage by passage
+        self.drg_mention = {k: Snippet(f"DRG{k} summary: {v}") for k, v in (drg_summaries or {}).items()}
+        self._doc_passages = chunk_markdown(site_context, 'site')
+        for k, v in (drg_details or {}).items():
+            for passage in chunk_markdown(v, 'drg'):
+                passage.title = passage.title or f"DRG {k}"
+                self._doc_passages.append(passage)
+        self.retrieval_k = int(os.getenv('CHAT_RETRIEVAL_TOP_K', '3'))
+        self.budget_ratio = float(budget_ratio if budget_ratio is not None else os.getenv('CHAT_PROMPT_BUDGET_RATIO', '6'))
+        self.min_budget = int(min_budget if min_budget is not None else os.getenv('CHAT_PROMPT_MIN_TOKENS', '600'))
+        self.max_budget = int(max_budget if max_budget is not None else os.getenv('CHAT_PROMPT_MAX_TOKENS', '3000'))
+        self.history_share = float(history_share if history_share is not None else os.getenv('CHAT_PROMPT_HISTORY_SHARE', '0.4'))
+        self.max_history = int(max_history if max_history is not None else os.getenv('CHAT_PROMPT_MAX_HISTORY', '20'))
+        self.set_indicators(indicators)
+
+    def set_indicators(self, indicators):
+        snippets = {}
+        passages = list(self._doc_passages)
+        for ind in indicators:
+            name = str(ind.get('Criterion/Metric Name') or '').strip()
+            if name:
+                snippets[name.lower()] = Snippet(indicator_snippet(ind))
+                passages.append(Passage('indicator', '', snippets[name.lower()].text, key=name.lower()))
+        rendered = {p: Snippet(p.render()) for p in passages}
+        # Swapped in one assignment so concurrent requests see the old or the new catalog
+        self._catalog = (snippets, BM25Index(passages), rendered)
+
+    @property
+    def indicators(self):
+        return self._catalog[0]
+
+    @property
+    def index(self):
+        return self._catalog[1]
+
+    def budget(self, max_tokens) -> int:
+        return max(self.min_budget, min(self.max_budget, int(max_tokens * self.budget_ratio)))
+
+    def _indicator(self, snippets, ind_or_name):
+        if ind_or_name is None:
+            return None
+        if isinstance(ind_or_name, dict):
+            key = str(ind_or_name.get('Criterion/Metric Name') or '').strip().lower()
+            return snippets.get(key) or Snippet(indicator_snippet(ind_or_name))
+        return snippets.get(str(ind_or_name).strip().lower())
+
+    def build(self, messages, context, max_tokens, system_prompt=None, mentioned_indicator=None, mentioned_drg=None):
+        """OpenAI `messages` for one chat turn; see the module docstring for the selection order."""
+        budget = self.budget(max_tokens)
+        snippets, index, rendered = self._catalog
+        system = Snippet(system_prompt) if system_prompt else self.system
+        indicator_name = context.get('indicator_name') or None
+        drg_short_code = str(context.get('drg_short_code') or '').strip()
+
+        ctx_lines = [f"route: {context.get('route')}"]
+        if indicator_name:
+            ctx_lines.append(f"indicator: {indicator_name}")
+        if drg_short_code:
+            ctx_lines.append(f"drg: {drg_short_code}")
+        ctx = Snippet("Context — " + "; ".join(ctx_lines))
+
+        history = []
+        for m in messages:
+            role = 'user' if m.get('role') == 'user' else 'assistant'
+            history.append((role, Snippet(str(m.get('content') or '')[:2000])))
+        history = history[-self.max_history:]
+        latest = len(history) - 1
+        while latest >= 0 and history[latest][0] != 'user':
+            latest -= 1
+
+        used = system.tokens + ctx.tokens
+        if indicator_name:
+            used += INDICATOR_NOTE.tokens
+        if context.get('asked_followup'):
+            used += NO_FOLLOWUP.tokens
+        if latest >= 0:
+            used += history[latest][1].tokens
+
+        # Optional context in priority order; history keeps a reserved share of the budget
+        context_budget = budget - int(budget * self.history_share)
+        mentioned_key = None if indicator_name or not isinstance(mentioned_indicator, dict) else \
+            str(mentioned_indicator.get('Criterion/Metric Name') or '').strip().lower()
+        candidates = [
+            ('indicator', self._indicator(snippets, indicator_name)),
+            ('mentioned_indicator', None if indicator_name else self._indicator(snippets, mentioned_indicator)),
+            ('mentioned_drg', self.drg_mention.get(mentioned_drg) if mentioned_drg else None),
+            ('drg_summary', self.drg_summary.get(drg_short_code) if drg_short_code else None),
+            ('extra', Snippet(str(context['extra_context'])[:1200]) if context.get('extra_context') else None),
+        ]
+        picked = {}
+        for key, snippet in candidates:
+            if snippet is not None and used + snippet.tokens <= context_budget:
+                picked[key] = snippet
+                used += snippet.tokens
+
+        # Passages retrieved for the latest message, best first, skipping indicators already injected
+        skip = {str(indicator_name).strip().lower() if indicator_name else None, mentioned_key}
+        retrieved = []
+        if latest >= 0 and self.retrieval_k > 0:
+            for _, passage in index.search(history[latest][1].text, k=self.retrieval_k):
+                snippet = rendered[passage]
+                if passage.key is not None and passage.key in skip:
+                    continue
+                if used + snippet.tokens + RETRIEVED_HEADER.tokens <= context_budget:
+                    retrieved.append(snippet.text)
+                    used += snippet.tokens
+        if retrieved:
+            used += RETRIEVED_HEADER.tokens
+
+        # History, newest first, into whatever budget is left
+        keep = set()
+        if latest >= 0:
+            keep.add(latest)
+        for i in range(len(history) - 1, -1, -1):
+            if i in keep:
+                continue
+            if used + history[i][1].tokens > budget:
+                break
+            keep.add(i)
+            used += history[i][1].tokens
+
+        out = [{"role": "system", "content": system.text}]
+        if retrieved:
+            out.append({"role": "system", "content": RETRIEVED_HEADER.text + "\n\n".join(retrieved)})
+        if indicator_name:
+            out.append({"role": "system", "content": INDICATOR_NOTE.text})
+        if 'drg_summary' in picked:
+            out.append({"role": "system", "content": picked['drg_summary'].text})
+        if 'extra' in picked:
+            out.append({"role": "system", "content": picked['extra'].text})
+        out.append({"role": "system", "content": ctx.text})
+        if context.get('asked_followup'):
+            out.append({"role": "system", "content": NO_FOLLOWUP.text})
+        for i, (role, snippet) in enumerate(history):
+            if i in keep:
+                out.append({"role": role, "content": snippet.text})
+        for key in ('indicator', 'mentioned_indicator', 'mentioned_drg'):
+            if key in picked:
+                out.append({"role": "system", "content": picked[key].text})
+        return out
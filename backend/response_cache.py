@@ -0,0 +1,111 @@
+"""Pre-serialized, gzip-compressed and ETag-tagged JSON bodies for read endpoints.
+
+A body is built once per (cache key, data version) and kept alongside its
+gzip form. The ETag is derived from the key and version only, so a request
+carrying a matching If-None-Match gets a 304 before any data is touched.
+
+The ETag is weak: the gzip and identity bodies are different bytes of the same
+data, and a strong validator may only be shared by byte-identical
+representations (RFC 9110 8.8.1). If-None-Match uses weak comparison anyway.
+A cache created with strong=True (badges) serves identity bodies only, so its
+strong ETag always names one byte sequence.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+GZIP_MIN_BYTES = 512
+
+
+def make_etag(key, version, weak=True) -> str:
+    digest = hashlib.sha1(f"{key}\0{version}".encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _opaque(tag) -> str:
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def etag_matches(if_none_match, etag) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or _opaque(tag) == _opaque(etag):
+            return True
+    return False
+
+
+class CachedBody:
+    __slots__ = ('body', 'etag', '_gzipped')
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self._gzipped = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256, strong=False):
+        self.max_entries = max_entries
+        self.strong = strong
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key, version, build):
+        """Cached body for (key, version); `build()` returns the serialized bytes on a miss."""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+        entry = CachedBody(build(), make_etag(key, version))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, req, key, version, build, mimetype='application/json', cache_control='no-cache', strong=None):
+        """Full response for a Flask request: 304, gzip or identity body.
+
+        `strong` (default: the cache's setting) gives a strong ETag and an identity-only body.
+        """
+        strong = self.strong if strong is None else strong
+        etag = make_etag(key, version, weak=not strong)
+        headers = {'ETag': etag, 'Cache-Control': cache_control}
+        if not strong:
+            headers['Vary'] = 'Accept-Encoding'
+        if etag_matches(req.headers.get('If-None-Match'), etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status=304, headers=headers)
+        entry = self.get(key, version, build)
+        body = entry.body
+        if not strong and len(body) >= GZIP_MIN_BYTES and 'gzip' in req.headers.get('Accept-Encoding', ''):
+            body = entry.gzipped
+            headers['Content-Encoding'] = 'gzip'
+        return Response(body, mimetype=mimetype, headers=headers)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
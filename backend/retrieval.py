@@ -0,0 +1,111 @@
+"""In-process BM25 retrieval over the chat grounding documents.
+
+site_context.md, drg_context.md and the indicator rows are cut into short
+passages at startup; each chat turn ranks them against the latest user
+message and only the top passages go into the prompt. Pure Python: an
+inverted index of term -> [(passage, tf)] so a query only touches the
+postings of its own terms.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can could do does for from has have how i if in into is it its me my
+no not of on or our should so than that the their them then there these they this to us was we what
+when where which who why will with would you your about please tell
+""".split())
+
+
+def tokenize(text) -> list:
+    return [w for w in _WORD.findall(str(text).lower()) if w not in STOPWORDS]
+
+
+class Passage:
+    __slots__ = ('source', 'title', 'text', 'key')
+
+    def __init__(self, source, title, text, key=None):
+        self.source = source
+        self.title = title
+        self.text = text
+        # Identity used to avoid injecting the same content twice (e.g. an indicator snippet)
+        self.key = key
+
+    def render(self) -> str:
+        return f"[{self.title}]\n{self.text}" if self.title else self.text
+
+
+def chunk_markdown(text, source, max_chars=700):
+    """Passages of whole paragraphs, each titled by its section heading.
+
+    A `#` heading, a lone short unpunctuated line, or a short line directly
+    followed by `- ` bullets starts a section; paragraphs longer than max_chars are split on line boundaries.
+    """
+    passages = []
+    title = ''
+    for block in re.split(r"\n\s*\n", text or ''):
+        lines = [ln.rstrip() for ln in block.strip().splitlines() if ln.strip()]
+        if not lines:
+            continue
+        if lines[0].lstrip().startswith('#'):
+            title = lines[0].lstrip('#').strip()
+            lines = lines[1:]
+        elif len(lines) == 1 and len(lines[0]) <= 80 and not lines[0].lstrip().startswith('-') \
+                and lines[0].rstrip()[-1] not in '.!?:':
+            # A lone short line without punctuation: a plain-text heading
+            title = lines[0].strip()
+            continue
+        elif len(lines) > 1 and len(lines[0]) <= 80 and not lines[0].lstrip().startswith('-') \
+                and lines[1].lstrip().startswith('-'):
+            title = lines[0].strip()
+            lines = lines[1:]
+        buf = []
+        for line in lines:
+            if buf and sum(len(b) + 1 for b in buf) + len(line) > max_chars:
+                passages.append(Passage(source, title, "\n".join(buf)))
+                buf = []
+            buf.append(line[:max_chars])
+        if buf:
+            passages.append(Passage(source, title, "\n".join(buf)))
+    return passages
+
+
+class BM25Index:
+    def __init__(self, passages=(), k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.passages = list(passages)
+        self._postings = {}
+        self._norm = []
+        self._idf = {}
+        lengths = []
+        for i, p in enumerate(self.passages):
+            terms = Counter(tokenize(f"{p.title} {p.text}"))
+            lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings.setdefault(term, []).append((i, tf))
+        n = len(self.passages)
+        avg = (sum(lengths) / n) if n else 0.0
+        # Per-passage length normalisation, precomputed: k1 * (1 - b + b * len / avg)
+        self._norm = [k1 * (1 - b + b * (length / avg if avg else 0.0)) for length in lengths]
+        for term, postings in self._postings.items():
+            df = len(postings)
+            self._idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def __len__(self):
+        return len(self.passages)
+
+    def search(self, query, k=3, min_score=0.0):
+        """Top-k passages for `query` as [(score, Passage)], best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norm[i])
+        ranked = heapq.nlargest(k, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+        return [(s, self.passages[i]) for i, s in ranked if s > min_score]
@@ -0,0 +1,219 @@
+"""Server-side scoring engine (mirrors frontend/src/scoring.js).
+
+Scores for the whole fleet live in one companies x indicators matrix so that
+per-DRG and overall scores can be recomputed in a single vectorized pass,
+e.g. after the indicator catalog changes.
+"""
+import threading
+
+# Imported by the first ScoringEngine rather than with this module: the catalog,
+# leaderboard and analytics only need the helpers below, and numpy is a large
+# share of app start-up
+np = None
+
+DRG_KEYS = ['1', '2', '3', '4', '5', '6', '7']
+DEFAULT_MAX_SCORE = 5
+
+
+def get_max_score_from_scoring_logic(scoring_logic) -> int:
+    """Highest level mentioned in a 'Scoring Logic' string such as '0=None; 1=Basic'."""
+    numbers = []
+    for part in str(scoring_logic or '').split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        digits = ''.join(ch for ch in part.split('=')[0] if ch.isdigit())
+        if digits:
+            numbers.append(int(digits))
+    return max(numbers) if numbers else DEFAULT_MAX_SCORE
+
+
+def indicator_drg(ind) -> str:
+    return str(ind.get('DRG Short Code') or ind.get('DRG') or '').strip()
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _round2(values):
+    # Math.round(x * 100) / 100 semantics (half-up), not numpy's half-even
+    return np.floor(values * 100 + 0.5) / 100
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ScoringEngine:
+    """Holds raw indicator scores for every company and recomputes DRG/overall scores.
+
+    Rows are companies, columns are indicators. Column metadata (max score per
+    indicator and the indicator -> DRG mask) is parsed once per catalog.
+    """
+
+    def __init__(self, indicators=None):
+        _numpy()
+        self._lock = threading.RLock()
+        self._ids = []
+        self._row = {}
+        self._raw = {}
+        self._matrix = np.zeros((0, 0))
+        self._buf = self._matrix
+        self.names = []
+        self._col = {}
+        self._max = np.zeros(0)
+        self._drg_mask = np.zeros((len(DRG_KEYS), 0))
+        self.set_indicators(indicators or [])
+
+    # --- catalog ---
+    def set_indicators(self, indicators):
+        """Re-parse catalog metadata and remap stored score columns to the new catalog."""
+        names, maxes, drgs = [], [], []
+        seen = set()
+        for ind in indicators:
+            name = str(ind.get('Criterion/Metric Name') or '').strip()
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            names.append(name)
+            maxes.append(get_max_score_from_scoring_logic(ind.get('Scoring Logic')))
+            drgs.append(indicator_drg(ind))
+        col = {n: i for i, n in enumerate(names)}
+        drg_mask = np.zeros((len(DRG_KEYS), len(names)))
+        for j, drg in enumerate(drgs):
+            if drg in DRG_KEYS:
+                drg_mask[DRG_KEYS.index(drg), j] = 1.0
+
+        with self._lock:
+            matrix = np.zeros((len(self._ids), len(names)))
+            kept = [n for n in names if n in self._col]
+            if kept:
+                matrix[:, [col[n] for n in kept]] = self._matrix[:, [self._col[n] for n in kept]]
+            added = [n for n in names if n not in self._col]
+            if added and self._ids:
+                # Indicators new to the catalog may already have scores on the records
+                for r, cid in enumerate(self._ids):
+                    scores = self._raw.get(cid) or {}
+                    for n in added:
+                        if n in scores:
+                            matrix[r, col[n]] = _to_float(scores[n])
+            self.names = names
+            self._col = col
+            self._max = np.asarray(maxes, dtype=float)
+            self._drg_mask = drg_mask
+            self._matrix = self._buf = matrix
+
+    # --- rows ---
+    def _row_vector(self, scores):
+        vec = np.zeros(len(self.names))
+        for name, value in (scores or {}).items():
+            j = self._col.get(name)
+            if j is not None:
+                vec[j] = _to_float(value)
+        return vec
+
+    def _grow(self, rows):
+        # Amortized O(1) appends: double the backing buffer instead of vstack per insert
+        if rows <= self._buf.shape[0] and self._buf.shape[1] == len(self.names):
+            return
+        buf = np.zeros((max(rows, 2 * self._buf.shape[0], 16), len(self.names)))
+        buf[:self._matrix.shape[0]] = self._matrix
+        self._buf = buf
+
+    def set_company(self, company_id, scores):
+        with self._lock:
+            vec = self._row_vector(scores)
+            r = self._row.get(company_id)
+            if r is None:
+                r = len(self._ids)
+                self._ids.append(company_id)
+                self._row[company_id] = r
+                self._grow(r + 1)
+                self._matrix = self._buf[:r + 1]
+                self._matrix[r] = vec
+            else:
+                self._matrix[r] = vec
+            self._raw[company_id] = dict(scores or {})
+
+    def load(self, companies):
+        """Replace all rows at once (startup / full reload)."""
+        with self._lock:
+            self._ids = []
+            self._row = {}
+            self._raw = {}
+            rows = []
+            for c in companies:
+                cid = c.get('id')
+                if cid is None or cid in self._row:
+                    continue
+                self._row[cid] = len(self._ids)
+                self._ids.append(cid)
+                self._raw[cid] = dict(c.get('scores') or {})
+                rows.append(self._row_vector(c.get('scores')))
+            self._matrix = self._buf = np.vstack(rows) if rows else np.zeros((0, len(self.names)))
+
+    def remove_company(self, company_id):
+        with self._lock:
+            r = self._row.pop(company_id, None)
+            if r is None:
+                return
+            self._raw.pop(company_id, None)
+            last = len(self._ids) - 1
+            if r != last:
+                # Swap-remove keeps the matrix dense without shifting rows
+                moved = self._ids[last]
+                self._ids[r] = moved
+                self._row[moved] = r
+                self._matrix[r] = self._matrix[last]
+            self._ids.pop()
+            self._matrix = self._matrix[:last]
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --- scoring ---
+    def _aggregate(self, matrix):
+        per_drg_max = self._drg_mask @ self._max
+        per_drg_total = matrix @ self._drg_mask.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_drg = np.where(per_drg_max > 0, per_drg_total / per_drg_max * 10, 0.0)
+        max_all = self._max.sum()
+        overall = matrix.sum(axis=1) / max_all * 10 if max_all > 0 else np.zeros(matrix.shape[0])
+        return _round2(overall), _round2(per_drg)
+
+    @staticmethod
+    def _result(overall, per_drg):
+        return {
+            'overallScore': float(overall),
+            'perDRG': {k: float(v) for k, v in zip(DRG_KEYS, per_drg)},
+        }
+
+    def score(self, scores) -> dict:
+        """Score a single scores dict without storing it."""
+        with self._lock:
+            overall, per_drg = self._aggregate(self._row_vector(scores)[None, :])
+        return self._result(overall[0], per_drg[0])
+
+    def score_many(self, scores_list) -> list:
+        """Score several scores dicts in one vectorized pass (bulk import)."""
+        if not scores_list:
+            return []
+        with self._lock:
+            overall, per_drg = self._aggregate(np.vstack([self._row_vector(s) for s in scores_list]))
+        return [self._result(o, d) for o, d in zip(overall.tolist(), per_drg.tolist())]
+
+    def rescore(self) -> dict:
+        """Recompute every stored company in one pass; returns {id: {overallScore, perDRG}}."""
+        with self._lock:
+            ids = list(self._ids)
+            overall, per_drg = self._aggregate(self._matrix)
+        # tolist() converts to Python floats in one pass instead of per element
+        return {cid: self._result(o, d) for cid, o, d in zip(ids, overall.tolist(), per_drg.tolist())}
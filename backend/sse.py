@@ -0,0 +1,50 @@
+"""Server-Sent Events relay for streamed chat completions."""
+import json
+
+
+def sse_event(data, event=None) -> str:
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def single_reply_events(reply):
+    """A whole reply as one delta plus the closing 'done' event."""
+    yield sse_event({"delta": reply})
+    yield sse_event({"reply": reply}, event='done')
+
+
+def relay_chat_stream(resp, fallback_reply):
+    """Re-emit an OpenAI streaming response as {"delta"} events, then a 'done' event with the full reply.
+
+    If the client disconnects, the WSGI server closes this generator; the
+    `finally` closes the upstream response, which cancels the upstream request.
+    """
+    parts = []
+    # SSE is always UTF-8; without a charset in Content-Type requests would guess ISO-8859-1
+    resp.encoding = 'utf-8'
+    try:
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            chunk = line[5:].strip()
+            if chunk == '[DONE]':
+                break
+            try:
+                delta = (json.loads(chunk).get('choices') or [{}])[0].get('delta', {}).get('content')
+            except ValueError:
+                continue
+            if delta:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        reply = ''.join(parts).strip()
+        if not reply:
+            yield sse_event({"delta": fallback_reply})
+        yield sse_event({"reply": reply or fallback_reply}, event='done')
+    except GeneratorExit:
+        raise
+    except Exception:
+        if not parts:
+            yield sse_event({"delta": fallback_reply})
+        yield sse_event({"reply": ''.join(parts).strip() or fallback_reply}, event='done')
+    finally:
+        resp.close()
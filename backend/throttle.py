@@ -0,0 +1,112 @@
+"""Request coalescing and rate limiting for the LLM endpoints.
+
+SingleFlight: concurrent calls with the same key share one execution; the
+first caller runs `fn`, the others wait for its result (or its exception).
+
+RateLimiter: token buckets in named scopes (e.g. 'session' and 'ip'), each
+scope with its own rate and burst. `allow({scope: key})` admits a request
+only if every bucket has a token, and only then takes one from each, so a
+request refused by its IP bucket does not also drain its session bucket.
+State is per process: with N gunicorn workers a client can get up to N
+times the configured rate.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"single-flight wait for {key!r} timed out")
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Longest Retry-After handed out; a scope with rate 0 never refills, and inf can't go in a header
+MAX_RETRY_AFTER = 3600.0
+
+
+class RateLimiter:
+    def __init__(self, limits, max_keys=100000):
+        # scope -> (tokens per second, burst)
+        self.limits = {scope: (float(per_min) / 60.0, float(burst)) for scope, (per_min, burst) in limits.items()}
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # (scope, key) -> [tokens, last refill]; LRU order so idle (i.e. full) buckets are evicted first
+        self._buckets = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def _bucket(self, scope, key, now):
+        rate, burst = self.limits[scope]
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            bucket = self._buckets[(scope, key)] = [burst, now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end((scope, key))
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        return bucket, rate
+
+    def allow(self, keys, cost=1.0):
+        """(allowed, retry_after_seconds) for a request charged to every {scope: key}; empty keys are skipped."""
+        now = time.monotonic()
+        with self._lock:
+            buckets = [self._bucket(scope, key, now) for scope, key in keys.items() if key and scope in self.limits]
+            retry_after = 0.0
+            for bucket, rate in buckets:
+                if bucket[0] < cost:
+                    retry_after = max(retry_after, (cost - bucket[0]) / rate if rate > 0 else MAX_RETRY_AFTER)
+            retry_after = min(retry_after, MAX_RETRY_AFTER)
+            if retry_after > 0:
+                self.limited += 1
+                return False, retry_after
+            for bucket, _ in buckets:
+                bucket[0] -= cost
+            self.allowed += 1
+            return True, 0.0
+
+    def __len__(self):
+        return len(self._buckets)
@@ -0,0 +1,158 @@
+"""Shared HTTP client for upstream APIs (OpenAI, ...).
+
+One pooled `requests.Session` per upstream keeps TCP+TLS connections alive
+between chat turns. Calls get bounded retries with full-jitter exponential
+backoff on connection errors, 429 and 5xx (honouring Retry-After), and a
+circuit breaker that fails fast while the upstream is degraded so callers can
+fall back immediately. The base URL is configurable, so a local stub server
+can stand in for the real API. `requests` is imported and the session built
+on the first call, so workers that never call upstream don't pay for it.
+"""
+import random
+import threading
+import time
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while the breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                return False
+            # Half-open: let a single probe through
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class UpstreamClient:
+    def __init__(self, name, base_url, timeout=15.0, retries=2, backoff=0.25, max_backoff=4.0,
+                 pool_size=20, breaker=None, observer=None):
+        self.name = name
+        # observer(name, outcome, seconds) after every call: ok | http_error | connection_error | circuit_open
+        self.observer = observer
+        self.retried = 0
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _delay(self, attempt, resp=None) -> float:
+        retry_after = resp.headers.get('Retry-After') if resp is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def post_json(self, path, payload, headers=None, stream=False, timeout=None):
+        """POST JSON with retries; returns the successful `requests.Response`.
+
+        Raises CircuitOpenError when failing fast, otherwise the last
+        requests exception (HTTPError for a final non-2xx status).
+        """
+        import requests
+        if self.observer is None:
+            return self._post_json(path, payload, headers, stream, timeout)
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            return self._post_json(path, payload, headers, stream, timeout)
+        except CircuitOpenError:
+            outcome = 'circuit_open'
+            raise
+        except requests.HTTPError:
+            outcome = 'http_error'
+            raise
+        except Exception:
+            outcome = 'connection_error'
+            raise
+        finally:
+            self.observer(self.name, outcome, time.perf_counter() - started)
+
+    def _post_json(self, path, payload, headers, stream, timeout):
+        import requests
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                resp = self.session.post(url, json=payload, headers=headers, stream=stream,
+                                         timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    self.breaker.record_failure()
+                    raise
+                self.retried += 1
+                time.sleep(self._delay(attempt))
+                continue
+            if resp.status_code in RETRY_STATUSES and not last:
+                delay = self._delay(attempt, resp)
+                resp.close()
+                self.retried += 1
+                time.sleep(delay)
+                continue
+            if resp.status_code == 429 or resp.status_code >= 500:
+                self.breaker.record_failure()
+                resp.raise_for_status()
+            # Other 4xx are the caller's problem, not an unhealthy upstream
+            self.breaker.record_success()
+            resp.raise_for_status()
+            return resp
@@ -7,17 +7,26 @@ export default function AdminFeedback({ backendBaseUrl = 'http://127.0.0.1:5000'
   const [routeFilter, setRouteFilter] = useState('');
   const [indicatorFilter, setIndicatorFilter] = useState('');
 
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const filterQuery = () => {
+    const qs = new URLSearchParams();
+    if (routeFilter) qs.set('route', routeFilter);
+    if (indicatorFilter) qs.set('indicator_name', indicatorFilter);
+    return qs;
+  };
+
   useEffect(() => {
     const load = async () => {
       setLoading(true);
       setError('');
       try {
-        const qs = new URLSearchParams();
-        if (routeFilter) qs.set('route', routeFilter);
-        if (indicatorFilter) qs.set('indicator_name', indicatorFilter);
+        const qs = filterQuery();
         const res = await fetch(`${backendBaseUrl}/api/feedback?${qs.toString()}`);
         const data = await res.json();
         setItems(Array.isArray(data.items) ? data.items : []);
+        setNextCursor(data.next_cursor || null);
       } catch (e) {
         setError('Failed to fetch feedback.');
       } finally {
@@ -25,8 +34,32 @@ export default function AdminFeedback({ backendBaseUrl = 'http://127.0.0.1:5000'
       }
     };
     load();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [backendBaseUrl, routeFilter, indicatorFilter]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const qs = filterQuery();
+      qs.set('cursor', nextCursor);
+      const res = await fetch(`${backendBaseUrl}/api/feedback?${qs.toString()}`);
+      const data = await res.json();
+      setItems(prev => prev.concat(Array.isArray(data.items) ? data.items : []));
+      setNextCursor(data.next_cursor || null);
+    } catch (e) {
+      setError('Failed to fetch feedback.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const exportUrl = (format) => {
+    const qs = filterQuery();
+    qs.set('format', format);
+    return `${backendBaseUrl}/api/feedback/export?${qs.toString()}`;
+  };
+
   return (
     <div>
       <h2 style={{ marginTop: 0 }}>Feedback Admin</h2>
@@ -39,6 +72,10 @@ export default function AdminFeedback({ backendBaseUrl = 'http://127.0.0.1:5000'
           <label className="label">Indicator filter</label>
           <input className="input" value={indicatorFilter} onChange={(e)=>setIndicatorFilter(e.target.value)} placeholder="Indicator name" />
         </div>
+        <div style={{ display: 'flex', gap: 8 }}>
+          <a className="button" href={exportUrl('csv')} download>Export CSV</a>
+          <a className="button" href={exportUrl('ndjson')} download>Export NDJSON</a>
+        </div>
       </div>
       {loading && <div>Loading…</div>}
       {error && <div className="helper" style={{ color: '#b00020' }}>{error}</div>}
@@ -74,6 +111,13 @@ export default function AdminFeedback({ backendBaseUrl = 'http://127.0.0.1:5000'
               <div>No feedback found.</div>
             </div>
           )}
+          {nextCursor && (
+            <div style={{ gridColumn: 'span 12' }}>
+              <button onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading…' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -13,6 +13,38 @@ function getOrCreateSessionId() {
   }
 }
 
+// Reads the chat endpoint's Server-Sent Events; calls onDelta with the text so far
+async function readChatStream(body, onDelta) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let text = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let idx;
+    while ((idx = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, idx);
+      buffer = buffer.slice(idx + 2);
+      let event = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      let parsed;
+      try { parsed = JSON.parse(data); } catch (_) { continue; }
+      if (event === 'done') return (parsed && parsed.reply) || text;
+      if (parsed && parsed.delta) {
+        text += parsed.delta;
+        if (onDelta) onDelta(text);
+      }
+    }
+  }
+  return text;
+}
+
 const INITIAL_PROMPT = 'Hi! I\'m here to collect your feedback or clarify questions about the evaluation. What\'s on your mind?';
 
 export default function FeedbackBot({
@@ -61,7 +93,7 @@ export default function FeedbackBot({
   const device = useMemo(() => (typeof window !== 'undefined' && window.innerWidth <= 768 ? 'mobile' : 'desktop'), []);
   const viewportWidth = useMemo(() => (typeof window !== 'undefined' ? window.innerWidth : 0), []);
 
-  const callLLM = async (userText) => {
+  const callLLM = async (userText, onDelta) => {
     try {
       console.log('Calling LLM API with:', { userText, route, indicatorName, sessionId });
       const res = await fetch(`${apiBase}/api/llm/chat`, {
@@ -74,9 +106,15 @@ export default function FeedbackBot({
           ...(typeof temperature === 'number' ? { temperature } : {}),
           ...(typeof model === 'string' && model ? { model } : {}),
           ...(typeof systemPrompt === 'string' && systemPrompt ? { system_prompt: systemPrompt } : {}),
+          stream: true,
         })
       });
       console.log('LLM API response status:', res.status);
+      const contentType = res.headers.get('content-type') || '';
+      if (res.body && contentType.includes('text/event-stream')) {
+        const streamed = await readChatStream(res.body, onDelta);
+        return streamed || 'Thanks for sharing. Could you add one concrete example or suggestion?';
+      }
       const data = await res.json();
       console.log('LLM API response data:', data);
       const reply = (data && data.reply) ? data.reply : 'Thanks for sharing. Could you add one concrete example or suggestion?';
@@ -98,8 +136,11 @@ export default function FeedbackBot({
     setInput('');
 
     try {
-      const assistant = await callLLM(text);
-      setMessages(prev => [...prev, { role: 'assistant', content: assistant }]);
+      // Placeholder bubble that fills in as tokens stream in
+      setMessages(prev => [...prev, { role: 'assistant', content: '…' }]);
+      const showAssistant = (content) => setMessages(prev => [...prev.slice(0, -1), { role: 'assistant', content }]);
+      const assistant = await callLLM(text, showAssistant);
+      showAssistant(assistant);
       // Heuristic: mark that we've had a follow-up if assistant asked a question
       if (!askedFollowupRef.current && /\?\s*$/m.test(assistant)) {
         askedFollowupRef.current = true;